@@ -1,8 +1,14 @@
 # Main launcher file
+import sys
 import tkinter as tk
+import password_manager_profile as prof
 from password_manager_gui import RetrowavePasswordManagerGUI
 
 def main():
+    # --profile prints timings when the window closes and shows live ones in the status bar
+    if "--profile" in sys.argv[1:]:
+        prof.enable(dump_at_exit=True)
+    
     # Create the main window
     root = tk.Tk()
     
@@ -0,0 +1,309 @@
+# Vault agent - keeps the vault loaded and answers lookups over a Unix socket
+#
+# Starting Python and re-reading credentials.json costs far more than the lookup itself,
+# so scripts that need many secrets can talk to one long-running agent instead:
+#
+#     python password_manager_agent.py serve &
+#     python password_manager_agent.py get github.com
+#     python password_manager_agent.py add --resource github.com --username me --password-stdin
+#
+# The protocol is one JSON object per line in each direction. Requests on a connection
+# are answered in order, so a client may send several before reading any replies.
+#
+#     -> {"op": "get", "resource": "github.com"}
+#     <- {"ok": true, "results": [{"username": ..., "password": ..., ...}]}
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import contextlib
+import statistics
+import subprocess
+import tempfile
+import password_manager_core as pm
+
+# Where the agent listens unless --socket says otherwise
+def default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"pwmanager-agent-{os.getuid()}.sock")
+
+# The type each request field must have; anything else is refused before the vault is touched
+FIELD_TYPES = {"resource": str, "username": str, "password": str, "category": str, "term": str, "limit": int}
+
+# This function makes sure a request only carries fields of the right type
+def check_fields(request):
+    """Return the request without null fields, or raise TypeError for a field of the wrong type"""
+    request = {field: value for field, value in request.items() if value is not None}
+    for field, kind in FIELD_TYPES.items():
+        value = request.get(field)
+        # True and False are ints to Python, but not a limit
+        if value is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+            raise TypeError(f"{field} must be a {'string' if kind is str else 'whole number'}")
+    return request
+
+# This function answers one request using the in-memory vault
+def handle_request(request):
+    request = check_fields(request)
+    op = request.get("op")
+
+    # A stat() call is enough to notice changes made by the CLI or the GUI
+    vault = pm.get_vault()
+
+    if op == "ping":
+        return {"ok": True, "version": vault.version, "count": len(vault.credentials)}
+
+    if op == "get":
+        return {"ok": True, "results": pm.get_credentials(request["resource"], request.get("username"))}
+
+    if op in ("search", "list"):
+        search_term = request["term"] if op == "search" else None
+        results = pm.filter_credentials(vault.credentials, search_term,
+                                        request.get("category"), request.get("limit"))
+        return {"ok": True, "results": list(results)}
+
+    if op == "add":
+        upsert = bool(request.get("upsert"))
+        if pm.find_credential(request["resource"], request["username"]) and not upsert:
+            return {"ok": False, "error": "already saved; send upsert to update it"}
+        pm.add_credential(request["username"], request.get("password", ""),
+                          request["resource"], request.get("category", ""), upsert=upsert)
+        return {"ok": True}
+
+    if op == "delete":
+        return {"ok": True, "results": pm.delete_entry(request["resource"], request["username"])}
+
+    return {"ok": False, "error": f"unknown op: {op}"}
+
+# These can wait for the vault lock or read every credential, so they run on a worker
+# thread; "get" and "ping" are answered straight away without leaving the event loop
+SLOW_OPS = ("add", "delete", "search", "list")
+
+# Serves one client connection until it hangs up
+async def serve_client(reader, writer):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError("expected a JSON object")
+                if request.get("op") in SLOW_OPS:
+                    response = await loop.run_in_executor(None, handle_request, request)
+                else:
+                    response = handle_request(request)
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": f"bad request: {e}"}
+            except pm.VaultConflictError as e:
+                response = {"ok": False, "error": str(e)}
+            except OSError as e:
+                response = {"ok": False, "error": f"could not save the vault: {e}"}
+            except Exception as e:
+                # One bad request must never cost the client the rest of its connection
+                response = {"ok": False, "error": f"request failed: {e}"}
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            # drain() only waits when the client is slow to read, so pipelined requests keep flowing
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(socket_path):
+    # Load the vault and build its indexes once, before the first client arrives
+    vault = pm.get_vault().build_indexes()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    # Only our own user may connect - the agent hands out passwords
+    old_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(serve_client, path=socket_path)
+    finally:
+        os.umask(old_umask)
+
+    print(f"Agent serving {len(vault.credentials)} credentials from {vault.path} on {socket_path}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+# ---- Client ----
+
+# A small blocking client, easy to use from other scripts
+class AgentClient:
+    def __init__(self, socket_path=None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_path or default_socket_path())
+        self.file = self.socket.makefile("rwb")
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def send(self, op, **fields):
+        self.file.write(json.dumps(dict(fields, op=op)).encode("utf-8") + b"\n")
+
+    def receive(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("agent closed the connection")
+        return json.loads(line)
+
+    def request(self, op, **fields):
+        """Send one request and wait for its response"""
+        self.send(op, **fields)
+        self.file.flush()
+        return self.receive()
+
+    def pipeline(self, requests):
+        """Send several (op, fields) requests at once and return their responses in order"""
+        for op, fields in requests:
+            self.send(op, **fields)
+        self.file.flush()
+        return [self.receive() for _ in requests]
+
+# ---- Benchmark ----
+
+def _summary(samples):
+    samples = sorted(samples)
+    return (f"median {statistics.median(samples) * 1000:8.3f} ms   "
+            f"p95 {samples[int(len(samples) * 0.95) - 1] * 1000:8.3f} ms")
+
+# This function compares agent lookups with starting the CLI for every lookup
+def benchmark(count=200, cold_count=10):
+    vault = pm.get_vault()
+    resource = vault.credentials[0]["resource"] if vault.credentials else "example.com"
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="pwmanager-bench-"), "agent.sock")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    agent = subprocess.Popen([sys.executable, os.path.join(script_dir, "password_manager_agent.py"),
+                              "--socket", socket_path, "serve"],
+                             stderr=subprocess.DEVNULL)
+    try:
+        # Wait for the agent to finish loading the vault
+        started = time.perf_counter()
+        while not os.path.exists(socket_path):
+            if agent.poll() is not None or time.perf_counter() - started > 60:
+                raise RuntimeError("agent did not start")
+            time.sleep(0.01)
+
+        with AgentClient(socket_path) as client:
+            agent_samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                client.request("get", resource=resource)
+                agent_samples.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            client.pipeline([("get", {"resource": resource})] * count)
+            pipelined = (time.perf_counter() - start) / count
+    finally:
+        agent.terminate()
+        agent.wait()
+
+    cold_samples = []
+    for _ in range(cold_count):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(script_dir, "password_manager_core.py"), "get", resource],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        cold_samples.append(time.perf_counter() - start)
+
+    print(f"Vault: {len(vault.credentials)} credentials")
+    print(f"Cold CLI ({cold_count} runs):        {_summary(cold_samples)}")
+    print(f"Agent ({count} requests):         {_summary(agent_samples)}")
+    print(f"Agent pipelined ({count} requests): {pipelined * 1000:8.3f} ms per request")
+    print(f"Speed-up (median): {statistics.median(cold_samples) / statistics.median(agent_samples):.0f}x")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="password_manager_agent.py",
+                                     description="Keep the vault loaded and answer lookups over a Unix socket.")
+    parser.add_argument("--socket", default=None, help=f"socket path (default {default_socket_path()})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("serve", help="run the agent")
+    commands.add_parser("ping", help="check that the agent is running")
+
+    get = commands.add_parser("get", help="get the credentials for a resource")
+    get.add_argument("resource")
+    get.add_argument("--username")
+
+    search = commands.add_parser("search", help="search resource, username and category")
+    search.add_argument("term")
+    list_command = commands.add_parser("list", help="list credentials")
+    for command in (search, list_command):
+        command.add_argument("--category")
+        command.add_argument("--limit", type=int)
+
+    add = commands.add_parser("add", help="add a credential")
+    add.add_argument("--resource", required=True)
+    add.add_argument("--username", required=True)
+    password = add.add_mutually_exclusive_group(required=True)
+    password.add_argument("--password")
+    password.add_argument("--password-stdin", action="store_true", help="read the password from stdin")
+    add.add_argument("--category", default="")
+    add.add_argument("--upsert", action="store_true", help="update the password if the account exists")
+
+    delete = commands.add_parser("delete", help="delete the credentials for an account")
+    delete.add_argument("--resource", required=True)
+    delete.add_argument("--username", required=True)
+
+    bench = commands.add_parser("bench", help="compare agent lookups with cold CLI runs")
+    bench.add_argument("--count", type=int, default=200)
+    bench.add_argument("--cold-count", type=int, default=10)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == "serve":
+        try:
+            # Messages like "Credentials saved" are for people, and the agent's stdout isn't one
+            with contextlib.redirect_stdout(sys.stderr):
+                asyncio.run(serve(socket_path))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if args.command == "bench":
+        benchmark(args.count, args.cold_count)
+        return 0
+
+    # Everything else is a thin client call
+    if args.command == "add" and args.password_stdin:
+        args.password = sys.stdin.readline().rstrip("\n")
+    fields = {key: value for key, value in vars(args).items()
+              if key not in ("command", "socket", "password_stdin") and value is not None}
+    try:
+        with AgentClient(socket_path) as client:
+            response = client.request(args.command, **fields)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No agent is listening on {socket_path}. Start one with: password_manager_agent.py serve", file=sys.stderr)
+        return 2
+
+    if not response.get("ok"):
+        print(response.get("error", "request failed"), file=sys.stderr)
+        return 1
+    if "results" in response:
+        sys.stdout.writelines(json.dumps(cred) + "\n" for cred in response["results"])
+        return 0 if response["results"] or args.command in ("search", "list") else 1
+    print(json.dumps(response))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# Benchmarks for the password manager
+#
+# Generates synthetic vaults (1k credentials up to 1M) and times the core operations on
+# each, plus the spinning Earth rendering without a window. Results are written to JSON.
+# When a baseline file exists, any operation that got slower than the allowed threshold
+# makes the run fail, so it can be used as a regression check:
+#
+#     python password_manager_benchmark.py --save-baseline     # on a known good version
+#     python password_manager_benchmark.py                     # later: exits 1 on a regression
+import os
+import sys
+import io
+import json
+import time
+import random
+import string
+import argparse
+import tempfile
+import contextlib
+from datetime import datetime, timedelta
+import password_manager_core as pm
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(SCRIPT_DIR, "benchmark_baseline.json")
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, "benchmark_results.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# ---- Synthetic vaults ----
+# Field values roughly follow what real vaults look like: a few very popular sites and a
+# long tail, most people reusing one or two usernames, a share of weak and reused passwords.
+POPULAR_SITES = ["google.com", "github.com", "amazon.com", "facebook.com", "netflix.com", "paypal.com",
+                 "microsoft.com", "apple.com", "reddit.com", "linkedin.com", "twitter.com", "dropbox.com"]
+WORDS = ["mail", "shop", "bank", "cloud", "game", "news", "forum", "travel", "music", "photo", "work", "home"]
+TLDS = [".com", ".net", ".org", ".io", ".co.uk", ".de"]
+CATEGORIES = ["Personal", "Work", "Finance", "Social", "Shopping", "Other"]
+CATEGORY_WEIGHTS = [30, 25, 10, 15, 12, 8]
+COMMON_PASSWORDS = ["123456", "password", "qwerty123", "letmein", "iloveyou", "Summer2024!", "welcome1", "dragon"]
+
+def _random_resource(rng):
+    if rng.random() < 0.3:
+        return rng.choice(POPULAR_SITES)
+    return rng.choice(WORDS) + rng.choice(WORDS) + str(rng.randrange(10000)) + rng.choice(TLDS)
+
+def _random_password(rng, reused):
+    roll = rng.random()
+    if roll < 0.1:
+        return rng.choice(COMMON_PASSWORDS)
+    if roll < 0.3 and reused:
+        return rng.choice(reused)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    password = "".join(rng.choice(alphabet) for _ in range(rng.randint(8, 24)))
+    if len(reused) < 50:
+        reused.append(password)
+    return password
+
+def generate_credentials(count, seed=0):
+    """Return a list of count realistic-looking credentials"""
+    rng = random.Random(seed)
+    handles = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(20)]
+    reused = []
+    newest = datetime(2026, 1, 1)
+    credentials_list = []
+    for _ in range(count):
+        handle = rng.choice(handles[:3]) if rng.random() < 0.7 else rng.choice(handles)
+        username = f"{handle}@example.com" if rng.random() < 0.6 else handle
+        added = newest - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        credentials_list.append({
+            "username": username,
+            "password": _random_password(rng, reused),
+            "resource": _random_resource(rng),
+            "category": rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+            "date_added": added.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+    return credentials_list
+
+# ---- Timing ----
+
+def _best_of(func, repeats):
+    """Run func a few times and return the fastest time in seconds"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+@contextlib.contextmanager
+def _vault_file(credentials_list):
+    """Point the core at a temporary vault holding credentials_list"""
+    old_file = pm.CREDENTIALS_FILE
+    with tempfile.TemporaryDirectory(prefix="pwmanager-bench-") as directory:
+        pm.CREDENTIALS_FILE = os.path.join(directory, "credentials.json")
+        try:
+            pm.save_credentials(credentials_list)
+            yield
+        finally:
+            pm.close_vault(pm.CREDENTIALS_FILE)
+            pm.CREDENTIALS_FILE = old_file
+
+def benchmark_core(size, repeats):
+    """Time the core operations on a vault of the given size"""
+    credentials_list = generate_credentials(size)
+    results = {}
+
+    with _vault_file(credentials_list):
+        results["load_credentials"] = _best_of(pm.load_credentials, repeats)
+        results["save_credentials"] = _best_of(lambda: pm.save_credentials(credentials_list), repeats)
+        results["search_credentials"] = _best_of(lambda: pm.search_credentials("mail"), repeats)
+        results["get_credentials_by_category"] = _best_of(pm.get_credentials_by_category, repeats)
+
+        # Bring the shared in-memory copy up to date first, so only the change itself is timed
+        pm.get_vault()
+        counter = iter(range(repeats))
+        results["add_credential"] = _best_of(
+            lambda: pm.add_credential(f"bench{next(counter)}", "hunter2", "benchmark.example", "Other"), repeats)
+        results["delete_credential"] = _best_of(lambda: pm.delete_credential(size // 2), repeats)
+
+    return results
+
+def benchmark_render(frames):
+    """Time the globe renderer without a window, or None if pygame or numpy is missing"""
+    try:
+        from password_manager_globe import GlobeRenderer, SPIN_STEP
+    except ImportError as e:
+        print(f"Skipping earth_render: {e}", file=sys.stderr)
+        return None
+
+    globe = GlobeRenderer(width=150, height=150)
+    globe.render()  # The first frame warms up font caches
+    start = time.perf_counter()
+    globe.render_frames(frames, SPIN_STEP, SPIN_STEP * (frames + 1))
+    return (time.perf_counter() - start) / frames
+
+def run(sizes, repeats, frames):
+    results = {}
+    for size in sizes:
+        print(f"Benchmarking {size} credentials...", file=sys.stderr)
+        # save_credentials and friends print a line per call, which would drown the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            for operation, seconds in benchmark_core(size, repeats).items():
+                results[f"{operation}[{size}]"] = seconds
+
+    if frames:
+        print("Benchmarking earth_render...", file=sys.stderr)
+        seconds = benchmark_render(frames)
+        if seconds is not None:
+            results["earth_render[frame]"] = seconds
+    return results
+
+# ---- Baseline comparison ----
+
+def find_regressions(results, baseline, threshold, slack):
+    """Return (name, baseline seconds, new seconds) for every operation that got too slow.
+
+    An operation regresses when it is more than threshold (a fraction) slower than the
+    baseline and also at least slack seconds slower, so tiny timings don't flap."""
+    regressions = []
+    for name, seconds in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if seconds > old * (1 + threshold) and seconds - old > slack:
+            regressions.append((name, old, seconds))
+    return regressions
+
+def print_report(results, baseline):
+    print(f"{'operation':<40}{'ms':>12}{'baseline ms':>14}{'change':>10}")
+    for name, seconds in results.items():
+        old = baseline.get(name)
+        if old:
+            print(f"{name:<40}{seconds * 1000:>12.3f}{old * 1000:>14.3f}{(seconds / old - 1) * 100:>9.1f}%")
+        else:
+            print(f"{name:<40}{seconds * 1000:>12.3f}{'-':>14}{'-':>10}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the password manager on synthetic vaults.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="vault sizes to test (default: 1000 10000 100000; add 1000000 for the big one)")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per operation, the fastest counts")
+    parser.add_argument("--frames", type=int, default=60, help="Earth frames to render (0 to skip)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--slack", type=float, default=0.002,
+                        help="slowdowns smaller than this many seconds are ignored (default 0.002)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeats, args.frames)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)["results"]
+
+    report = {"created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+              "python": sys.version.split()[0],
+              "results": results}
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=4)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=4)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.threshold, args.slack)
+    for name, old, new in regressions:
+        print(f"REGRESSION: {name} took {new * 1000:.3f} ms, baseline {old * 1000:.3f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,43 +1,1079 @@
 # Import the modules we need for our program
 import os             # For checking if files exist, working with file paths
+import sys            # For the command line arguments and output streams
 import json           # For storing data in a structured format (better than plain text)
-from datetime import datetime  # For adding timestamps
+import argparse       # For the scriptable subcommands (add, get, search, list...)
+import itertools      # For stopping early once --limit results were found
+import hashlib        # For SHA-1 hashing passwords in the breach audit
+import math           # For working out password entropy
+import string         # For the character classes used in password entropy
+import mmap           # For searching huge breach files without loading them into memory
+import re             # For peeking at the version number without parsing the whole file
+import tempfile       # For writing the new file next to the old one before swapping them
+import threading      # For remembering which locks this thread already holds
+import atexit         # For saving the index snapshots when the program ends
+import gc             # For pausing garbage collection while the indexes are built
+import array          # For writing the index snapshot as raw numbers
+import bisect         # For keeping the sorted listings in order as credentials come and go
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # For hashing passwords and searching vaults in parallel
+import contextlib     # For sending human-readable messages to stderr in the scriptable CLI
+from contextlib import contextmanager  # For the "with vault_lock():" helper
+from datetime import datetime, timedelta  # For adding timestamps
+import password_manager_profile as prof  # Timings and counters for --profile
+
+# File locking works differently on Windows and everywhere else
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CREDENTIALS_FILE = os.path.join(SCRIPT_DIR, "credentials.json")
 
-# This function loads our saved passwords from the file
-def load_credentials():
+# Raised when somebody else saved the vault after we read it
+class VaultConflictError(Exception):
+    pass
+
+# Locks held by the current thread, so nested "with vault_lock():" blocks don't deadlock
+_held_locks = threading.local()
+
+# This makes sure only one program at a time can change the vault.
+# The CLI and the GUI can both be open on the same file, so every
+# load -> modify -> save has to happen while holding this lock.
+@contextmanager
+def vault_lock(path=None):
+    path = path or CREDENTIALS_FILE
+    depth = getattr(_held_locks, "depth", None)
+    if depth is None:
+        depth = _held_locks.depth = {}
+
+    # We already hold it further up the call stack
+    if depth.get(path):
+        depth[path] += 1
+        try:
+            yield
+        finally:
+            depth[path] -= 1
+        return
+
+    # The lock lives in a separate file because the vault itself gets replaced on save
+    with open(path + ".lock", "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        depth[path] = 1
+        try:
+            yield
+        finally:
+            depth[path] = 0
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+# This function loads the vault file and returns (version, credentials list)
+@prof.timed("core.load_credentials")
+def load_vault(path=None):
+    path = path or CREDENTIALS_FILE
     # First check if we have any saved passwords
-    if os.path.exists(CREDENTIALS_FILE):
+    if os.path.exists(path):
         try:
             # Try to read the file - using 'with' automatically closes the file after we're done
-            with open(CREDENTIALS_FILE, "r") as file:
-                return json.load(file)
+            with open(path, "r") as file:
+                data = json.load(file)
+                prof.count("bytes_read", file.tell())
         except json.JSONDecodeError:
             # If the file is corrupted or empty, just start fresh
             # This prevents crashes if the file gets messed up somehow
             print("Warning: Could not read credentials file. Starting with empty list.")
-            return []
+            return 0, []
+
+        # Old vaults are just a plain list - treat them as version 0
+        if isinstance(data, list):
+            return 0, data
+        return data.get("version", 0), data.get("credentials", [])
     else:
         # If the file doesn't exist yet, return an empty list to start with
-        return []
+        return 0, []
+
+# The version is written first, so we can usually read it without loading everything
+_VERSION_PATTERN = re.compile(r'^\s*\{\s*"version":\s*(\d+)')
+
+def read_vault_version(path=None):
+    """Return the version number currently stored in the vault file"""
+    path = path or CREDENTIALS_FILE
+    try:
+        with open(path, "r") as file:
+            match = _VERSION_PATTERN.match(file.read(64))
+    except FileNotFoundError:
+        return 0
+    if match:
+        return int(match.group(1))
+    return load_vault(path)[0]
+
+# This function loads our saved passwords from the file
+def load_credentials():
+    return load_vault()[1]
 
 # This function saves the passwords to the file
-def save_credentials(credentials_list):
-    # Save everything to a formatted JSON file
-    # The indent=4 makes the file human-readable if opened in a text editor
-    with open(CREDENTIALS_FILE, "w") as file:
-        json.dump(credentials_list, file, indent=4)
-    print(f"Credentials saved to {CREDENTIALS_FILE}")
+@prof.timed("core.save_credentials")
+def save_credentials(credentials_list, expected_version=None, path=None):
+    path = path or CREDENTIALS_FILE
+    with vault_lock(path):
+        # Refuse to overwrite changes someone else made after we read the file
+        current_version = read_vault_version(path)
+        if expected_version is not None and current_version != expected_version:
+            raise VaultConflictError(
+                f"Vault changed on disk (version {current_version}, expected {expected_version})")
+
+        # Remember what was there before, so the history can record what this save changed
+        if HISTORY_ENABLED:
+            old_list = _current_credentials(path)
+
+        # Save everything to a formatted JSON file
+        # The indent=4 makes the file human-readable if opened in a text editor
+        # We write to a temporary file first and then swap it in, so nobody ever reads half a file
+        vault = {"version": current_version + 1, "credentials": credentials_list}
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".credentials-")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(vault, file, indent=4)
+                prof.count("bytes_written", file.tell())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        if HISTORY_ENABLED:
+            record_history(old_list, current_version, credentials_list, current_version + 1, path)
+
+        # We know exactly what the file holds now, so the shared copy doesn't need to read it back
+        vault = _open_vaults.get(os.path.abspath(path))
+        if vault is not None:
+            vault.saved(current_version + 1, credentials_list)
+    print(f"Credentials saved to {path}")
     return True  # Return True to indicate success
 
+# What the vault file holds right now; an open in-memory copy saves re-reading it
+def _current_credentials(path):
+    vault = _open_vaults.get(os.path.abspath(path))
+    if vault is not None:
+        vault.poll_changes()
+        return vault.credentials
+    return load_vault(path)[1]
+
+# Adds one credential to the vault while holding the lock.
+# With upsert=True an existing entry for the same resource and username gets the
+# new password and timestamp instead of a second row being added.
+def _store_credential(new_credential, upsert=False):
+    with vault_lock():
+        # Polling under the lock makes our in-memory copy match the file exactly
+        vault = get_vault()
+        credentials_list = list(vault.credentials)
+
+        existing = vault.entries.find(new_credential["resource"], new_credential["username"]) if upsert else []
+        if existing:
+            old_credential = existing[0]
+            updated = dict(old_credential,
+                           password=new_credential["password"],
+                           date_added=new_credential["date_added"])
+            credentials_list[credentials_list.index(old_credential)] = updated
+        else:
+            credentials_list.append(new_credential)
+
+        return save_credentials(credentials_list, expected_version=vault.version)
+
+# A hashable stand-in for a credential, used to compare two copies of the vault
+def credential_key(cred):
+    return tuple(sorted(cred.items()))
+
+# This function works out which credentials were added and removed between two lists.
+# It returns (merged, added, removed), where merged is new_list with every unchanged credential
+# replaced by the object from old_list. Indexes hold on to those objects, so keeping them the same
+# lets everything compare credentials by identity, whichever copy of the file they came from.
+def merge_credentials(old_list, new_list):
+    # Nothing to compare against the first time a vault is loaded
+    if not old_list:
+        return list(new_list), list(new_list), []
+
+    # A list we saved ourselves is mostly the very same objects, which match without
+    # comparing values; only the rest need the (much slower) credential_key
+    old_ids = {id(cred) for cred in old_list}
+    same_objects = {id(cred) for cred in new_list if id(cred) in old_ids}
+
+    unmatched = {}
+    for cred in old_list:
+        if id(cred) not in same_objects:
+            unmatched.setdefault(credential_key(cred), []).append(cred)
+
+    merged = []
+    added = []
+    for cred in new_list:
+        if id(cred) in same_objects:
+            merged.append(cred)
+            continue
+        same = unmatched.get(credential_key(cred))
+        if same:
+            merged.append(same.pop(0))
+        else:
+            merged.append(cred)
+            added.append(cred)
+
+    kept = {id(cred) for cred in merged}
+    removed = [cred for cred in old_list if id(cred) not in kept]
+    return merged, added, removed
+
+# ---- Password strength and reuse ----
+# Random for every run, so the index never holds anything that could be checked
+# against a list of common password hashes
+_PASSWORD_INDEX_KEY = os.urandom(32)
+
+# Rough size of each character class, used to estimate how guessable a password is
+_CHARACTER_CLASSES = [
+    (set(string.ascii_lowercase), 26),
+    (set(string.ascii_uppercase), 26),
+    (set(string.digits), 10),
+    (set(string.punctuation + " "), 33),
+]
+
+_KNOWN_CHARACTERS = set().union(*(members for members, size in _CHARACTER_CLASSES))
+
+# This function estimates the entropy of a password in bits
+def password_entropy(password):
+    characters = set(password)
+    pool = sum(size for members, size in _CHARACTER_CLASSES if characters & members)
+    # Anything outside the classes above (accents, emoji...) counts as a big extra pool
+    if characters - _KNOWN_CHARACTERS:
+        pool += 100
+    if not pool:
+        return 0.0
+    return round(len(password) * math.log2(pool), 1)
+
+# This function turns an entropy value into a label for people
+def password_strength(entropy):
+    if entropy < 28:
+        return "VERY WEAK"
+    if entropy < 36:
+        return "WEAK"
+    if entropy < 60:
+        return "REASONABLE"
+    if entropy < 128:
+        return "STRONG"
+    return "VERY STRONG"
+
+# Groups credentials by a keyed hash of their password, so reuse is found without comparing every pair
+class PasswordIndex:
+    def __init__(self):
+        self.groups = {}   # password hash -> {id(cred): cred} for the credentials using that password
+        self.entropy = {}  # password hash -> entropy, worked out once per distinct password when first needed
+
+    def _hash(self, password):
+        return hashlib.blake2b(password.encode("utf-8"), key=_PASSWORD_INDEX_KEY, digest_size=16).digest()
+
+    def add(self, cred):
+        password_hash = self._hash(cred.get("password", ""))
+        group = self.groups.get(password_hash)
+        if group is None:
+            group = self.groups[password_hash] = {}
+        group[id(cred)] = cred
+
+    def remove(self, cred):
+        # Rows are matched by identity, like merge_credentials does, so two identical rows
+        # stay two separate entries and removing one never takes out the other
+        password_hash = self._hash(cred.get("password", ""))
+        group = self.groups.get(password_hash)
+        if group is None:
+            return
+        group.pop(id(cred), None)
+        if not group:
+            del self.groups[password_hash]
+            self.entropy.pop(password_hash, None)
+
+    def apply_changes(self, added, removed):
+        for cred in removed:
+            self.remove(cred)
+        for cred in added:
+            self.add(cred)
+
+    def uses_of(self, password):
+        """Return the credentials that already use this password"""
+        return list(self.groups.get(self._hash(password), {}).values())
+
+    def reused_groups(self):
+        """Return a list of credential groups that share one password"""
+        return [list(group.values()) for group in self.groups.values() if len(group) > 1]
+
+    def scores(self):
+        """Return (credential, entropy, strength label) for every credential"""
+        result = []
+        for password_hash, group in self.groups.items():
+            entropy = self.entropy.get(password_hash)
+            if entropy is None:
+                entropy = self.entropy[password_hash] = password_entropy(next(iter(group.values())).get("password", ""))
+            for cred in group.values():
+                result.append((cred, entropy, password_strength(entropy)))
+        return result
+
+# ---- Duplicate entries ----
+# Two entries are the same account if resource and username match, ignoring case and spaces
+def entry_key(resource, username):
+    return (resource.strip().lower(), username.strip().lower())
+
+# Looks up credentials by (resource, username) in constant time
+class EntryIndex:
+    def __init__(self):
+        self.entries = {}    # entry key -> {id(cred): cred} with that resource and username
+        self.resources = {}  # normalised resource -> {id(cred): cred} for any username
+
+    def add(self, cred):
+        key = entry_key(cred["resource"], cred["username"])
+        self.entries.setdefault(key, {})[id(cred)] = cred
+        self.resources.setdefault(key[0], {})[id(cred)] = cred
+
+    def remove(self, cred):
+        # By identity, so each removal is one dictionary lookup however big the group is
+        key = entry_key(cred["resource"], cred["username"])
+        for index, index_key in ((self.entries, key), (self.resources, key[0])):
+            group = index.get(index_key)
+            if group is None:
+                continue
+            group.pop(id(cred), None)
+            if not group:
+                del index[index_key]
+
+    def apply_changes(self, added, removed):
+        for cred in removed:
+            self.remove(cred)
+        for cred in added:
+            self.add(cred)
+
+    def find(self, resource, username):
+        """Return the credentials stored for this resource and username"""
+        return list(self.entries.get(entry_key(resource, username), {}).values())
+
+    def find_resource(self, resource):
+        """Return the credentials stored for this resource, whatever the username"""
+        return list(self.resources.get(resource.strip().lower(), {}).values())
+
+    def duplicate_count(self):
+        return sum(len(group) - 1 for group in self.entries.values())
+
+# ---- Sorted listing ----
+# Fields the listing can be sorted by, and how to turn each into something that sorts right.
+# "%Y-%m-%d %H:%M:%S" timestamps already sort in date order as plain strings.
+SORT_FIELDS = {
+    "resource": lambda cred: cred["resource"].lower(),
+    "username": lambda cred: cred["username"].lower(),
+    "date_added": lambda cred: cred.get("date_added", ""),
+}
+
+# Keeps the credentials sorted by every field in SORT_FIELDS, for the whole vault and per
+# category, so one page of a listing is a slice instead of a sort of the whole vault.
+class SortIndex:
+    # Above this many changes at once it is quicker to sort again than to insert one by one
+    BULK_THRESHOLD = 64
+    # What snapshot() writes to the index snapshot file
+    SNAPSHOT_ARRAYS = ("sort.sequence",) + tuple("sort." + field for field in SORT_FIELDS)
+
+    def __init__(self):
+        self.orders = {field: [] for field in SORT_FIELDS}  # field -> sorted [(key, sequence, cred)]
+        self.categories = {}  # category -> {field: sorted [(key, sequence, cred)]}
+        self._sequence = {}   # id(cred) -> sequence number; breaks ties in the order credentials arrived
+        self._next_sequence = 0
+
+    def _orders_for(self, cred):
+        category = cred.get("category", "Uncategorized")
+        if category not in self.categories:
+            self.categories[category] = {field: [] for field in SORT_FIELDS}
+        return self.orders, self.categories[category]
+
+    def apply_changes(self, added, removed):
+        for cred in removed:
+            sequence = self._sequence.pop(id(cred), None)
+            if sequence is None:
+                continue
+            for orders in self._orders_for(cred):
+                for field, make_key in SORT_FIELDS.items():
+                    order = orders[field]
+                    position = bisect.bisect_left(order, (make_key(cred), sequence))
+                    del order[position]
+            category = cred.get("category", "Uncategorized")
+            if not self.categories[category]["resource"]:
+                del self.categories[category]
+
+        if len(added) <= self.BULK_THRESHOLD:
+            for cred in added:
+                sequence = self._new_sequence(cred)
+                for field, make_key in SORT_FIELDS.items():
+                    entry = (make_key(cred), sequence, cred)
+                    for orders in self._orders_for(cred):
+                        bisect.insort(orders[field], entry)
+            return
+
+        # Many at once (like loading the vault): sort the whole-vault orders once, then
+        # share them out per category, which keeps them sorted without sorting again.
+        # Sequence numbers are unique, so sorting never has to compare the dictionaries.
+        sequences = [self._new_sequence(cred) for cred in added]
+        for field, make_key in SORT_FIELDS.items():
+            order = self.orders[field]
+            order.extend(zip(map(make_key, added), sequences, added))
+            order.sort()
+        self._split_categories()
+
+    def _split_categories(self):
+        categories = self.categories = {}
+        for field, order in self.orders.items():
+            for entry in order:
+                category = entry[2].get("category", "Uncategorized")
+                orders = categories.get(category)
+                if orders is None:
+                    orders = categories[category] = {name: [] for name in SORT_FIELDS}
+                orders[field].append(entry)
+
+    def _new_sequence(self, cred):
+        sequence = self._sequence[id(cred)] = self._next_sequence
+        self._next_sequence += 1
+        return sequence
+
+    def snapshot(self, credentials_list, positions):
+        """The orders as lists of positions in credentials_list, for write_index_snapshot"""
+        arrays = {"sort.sequence": [self._sequence[id(cred)] for cred in credentials_list]}
+        for field, order in self.orders.items():
+            arrays["sort." + field] = [positions[id(entry[2])] for entry in order]
+        return arrays
+
+    def restore(self, credentials_list, arrays):
+        """Fill an empty index from a snapshot instead of sorting everything again"""
+        sequences = arrays["sort.sequence"]
+        self._sequence = dict(zip(map(id, credentials_list), sequences))
+        self._next_sequence = max(sequences, default=-1) + 1
+
+        # Number the categories, so each entry can be dropped into its category's order
+        # by list position while the whole-vault order is rebuilt
+        names = {}
+        category_numbers = [names.setdefault(cred.get("category", "Uncategorized"), len(names))
+                            for cred in credentials_list]
+        self.categories = {name: {field: [] for field in SORT_FIELDS} for name in names}
+        for field, make_key in SORT_FIELDS.items():
+            keys = list(map(make_key, credentials_list))
+            order = self.orders[field] = []
+            category_orders = [self.categories[name][field] for name in names]
+            for i in arrays["sort." + field]:
+                entry = (keys[i], sequences[i], credentials_list[i])
+                order.append(entry)
+                category_orders[category_numbers[i]].append(entry)
+
+    def sort_key(self, cred, sort_by="resource"):
+        """The value this credential is ordered by in the sort_by listing"""
+        return (SORT_FIELDS[sort_by](cred), self._sequence[id(cred)])
+
+    def count(self, category=None):
+        if category is None:
+            return len(self.orders["resource"])
+        return len(self.categories.get(category, {}).get("resource", []))
+
+    def page(self, sort_by="resource", descending=False, offset=0, limit=None, category=None):
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Can't sort by {sort_by!r}; use one of {', '.join(SORT_FIELDS)}")
+        if category is None:
+            order = self.orders[sort_by]
+        else:
+            order = self.categories.get(category, {}).get(sort_by, [])
+
+        offset = max(offset, 0)
+        end = len(order) if limit is None else min(len(order), offset + max(limit, 0))
+        if descending:
+            entries = order[len(order) - end:len(order) - offset][::-1]
+        else:
+            entries = order[offset:end]
+        return [entry[2] for entry in entries]
+
+    def category_names(self):
+        return sorted(self.categories, key=str.lower)
+
+# ---- Credential age ----
+
+# Passwords older than this many days are due to be changed
+ROTATION_DAYS = 90
+
+def parse_date_added(cred):
+    """The date a credential was added as a datetime; datetime.min if it is missing or unreadable"""
+    try:
+        # fromisoformat reads "%Y-%m-%d %H:%M:%S" many times faster than strptime
+        added = datetime.fromisoformat(cred.get("date_added", ""))
+    except (TypeError, ValueError):
+        return datetime.min
+    # Imported dates may carry a UTC offset ("...Z", "+02:00"). Ours are local time without
+    # one, and Python can't compare the two kinds, so turn them into local time too.
+    if added.tzinfo is not None:
+        added = added.astimezone().replace(tzinfo=None)
+    return added
+
+# Every credential ordered by the date it was added, oldest first.
+# Dates are parsed once when a credential arrives, so queries never parse anything.
+class AgeIndex:
+    # What snapshot() writes to the index snapshot file
+    SNAPSHOT_ARRAYS = ("age.sequence", "age.order")
+
+    def __init__(self):
+        self.order = []    # sorted [(date added, sequence, cred)]
+        self._keys = {}    # id(cred) -> (date added, sequence)
+        self._next_sequence = 0
+
+    def apply_changes(self, added, removed):
+        for cred in removed:
+            key = self._keys.pop(id(cred), None)
+            if key is not None:
+                del self.order[bisect.bisect_left(self.order, key)]
+
+        entries = []
+        for cred in added:
+            key = self._keys[id(cred)] = (parse_date_added(cred), self._next_sequence)
+            self._next_sequence += 1
+            entries.append(key + (cred,))
+        if len(entries) > SortIndex.BULK_THRESHOLD:
+            self.order.extend(entries)
+            self.order.sort()
+        else:
+            for entry in entries:
+                bisect.insort(self.order, entry)
+
+    def snapshot(self, credentials_list, positions):
+        """The order as a list of positions in credentials_list, for write_index_snapshot"""
+        return {"age.sequence": [self._keys[id(cred)][1] for cred in credentials_list],
+                "age.order": [positions[id(entry[2])] for entry in self.order]}
+
+    def restore(self, credentials_list, arrays):
+        """Fill an empty index from a snapshot; dates are parsed again, but nothing is sorted"""
+        sequences = arrays["age.sequence"]
+        dates = list(map(parse_date_added, credentials_list))
+        self._keys = {id(cred): (date, sequence) for cred, date, sequence in zip(credentials_list, dates, sequences)}
+        self._next_sequence = max(sequences, default=-1) + 1
+        self.order = [(dates[i], sequences[i], credentials_list[i]) for i in arrays["age.order"]]
+
+    def oldest(self, limit=None):
+        """The limit oldest credentials, oldest first"""
+        entries = self.order if limit is None else self.order[:max(limit, 0)]
+        return [entry[2] for entry in entries]
+
+    def added_before(self, cutoff, limit=None):
+        """Credentials added before the cutoff datetime, oldest first"""
+        end = bisect.bisect_left(self.order, (cutoff,))
+        if limit is not None:
+            end = min(end, max(limit, 0))
+        return [entry[2] for entry in self.order[:end]]
+
+# ---- Index snapshots ----
+# Building the indexes takes far longer than reading the vault, so the slow parts (the sorted
+# orders) are saved next to it in "<vault>.index". The snapshot holds only positions in the
+# credentials list, never passwords, and is used only if the vault's mtime, size, inode,
+# version and length all still match.
+INDEX_SNAPSHOTS = True
+INDEX_SNAPSHOT_MAGIC = b"PWMIDX1\0"
+
+def index_snapshot_path(path=None):
+    return (path or CREDENTIALS_FILE) + ".index"
+
+def write_index_snapshot(path, signature, version, credentials_list, indexes, carried=None):
+    """Save the snapshot() of each index for the vault file as it is at signature and version,
+    along with any arrays in carried that are still good from an earlier snapshot"""
+    positions = {id(cred): i for i, cred in enumerate(credentials_list)}
+    arrays = dict(carried or {})
+    for index in indexes:
+        arrays.update(index.snapshot(credentials_list, positions))
+
+    header = json.dumps({"signature": list(signature), "version": version, "count": len(credentials_list),
+                         "byteorder": sys.byteorder, "arrays": list(arrays)}).encode("utf-8")
+    # Pad the header so the numbers start on a 4-byte boundary
+    header += b" " * (-(len(INDEX_SNAPSHOT_MAGIC) + 4 + len(header)) % 4)
+
+    snapshot_path = index_snapshot_path(path)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), prefix=".index-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(INDEX_SNAPSHOT_MAGIC + len(header).to_bytes(4, "little") + header)
+            for values in arrays.values():
+                file.write(array.array("I", values).tobytes())
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def read_index_snapshot(path, signature, version, count, names=None):
+    """Return {array name: list of numbers} if the snapshot matches the vault, otherwise None.
+
+    With names, only those arrays are read, and None is returned unless all of them are there."""
+    try:
+        with open(index_snapshot_path(path), "rb") as file:
+            snapshot = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    with snapshot:
+        start = len(INDEX_SNAPSHOT_MAGIC) + 4
+        if snapshot[:len(INDEX_SNAPSHOT_MAGIC)] != INDEX_SNAPSHOT_MAGIC:
+            return None
+        header_length = int.from_bytes(snapshot[len(INDEX_SNAPSHOT_MAGIC):start], "little")
+        try:
+            header = json.loads(snapshot[start:start + header_length])
+        except ValueError:
+            return None
+        if (header.get("signature") != list(signature or ()) or header.get("version") != version
+                or header.get("count") != count or header.get("byteorder") != sys.byteorder):
+            return None
+
+        start += header_length
+        stored = header["arrays"]
+        if len(snapshot) - start != len(stored) * count * 4:
+            return None
+        if names is None:
+            names = stored
+        elif not set(names) <= set(stored):
+            return None
+        # Read the numbers straight out of the mapped file instead of parsing them
+        numbers = memoryview(snapshot)[start:].cast("I")
+        try:
+            return {name: numbers[i * count:(i + 1) * count].tolist()
+                    for i, name in enumerate(stored) if name in names}
+        finally:
+            numbers.release()
+
+# Keeps an in-memory copy of a vault file and notices when another program changes it.
+# Indexes and listeners are handed only the credentials that were added or removed.
+class Vault:
+    # The indexes a vault can have. Each one is built the first time it is used, so a
+    # command that only lists or searches never pays for any of them.
+    INDEXES = {"passwords": PasswordIndex, "entries": EntryIndex, "sorted": SortIndex, "ages": AgeIndex}
+
+    def __init__(self, path=None):
+        self.path = path or CREDENTIALS_FILE
+        self.version = 0
+        self.credentials = []
+        self._signature = None
+
+        self._indexes = {}  # name -> index built so far, kept up to date with every change
+        self._snapshot_stale = False  # built or changed since the snapshot file was written
+        # Held while the in-memory copy or its indexes change, so a save on one thread and a
+        # poll on another (the agent does both) apply one after the other
+        self._lock = threading.RLock()
+        self.listeners = []
+        self._load()
+
+    @property
+    def passwords(self):
+        return self._index("passwords")
+
+    @property
+    def entries(self):
+        return self._index("entries")
+
+    @property
+    def sorted(self):
+        return self._index("sorted")
+
+    @property
+    def ages(self):
+        return self._index("ages")
+
+    def _index(self, name):
+        index = self._indexes.get(name)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(name)
+                if index is None:
+                    index = self._indexes[name] = self._build_index(name)
+        return index
+
+    def build_indexes(self):
+        """Build every index now rather than on first use, and return the vault.
+
+        For long-running programs like the agent that would rather pay up front."""
+        for name in self.INDEXES:
+            self._index(name)
+        return self
+
+    def _load(self):
+        self._signature = self._stat_signature()
+        self.version, credentials_list = load_vault(self.path)
+        self.credentials = list(credentials_list)
+
+    def _build_index(self, name):
+        """Fill a new index from the snapshot file if it is still valid, otherwise from scratch.
+
+        If building fails the error is raised and nothing is kept, so every use raises it
+        again rather than getting answers from a half-built index."""
+        index_type = self.INDEXES[name]
+        index = index_type()
+        snapshot_arrays = getattr(index_type, "SNAPSHOT_ARRAYS", None)
+        # Hundreds of thousands of new tuples would set the garbage collector off over and
+        # over, and each run looks at every credential again; none of them form cycles
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with prof.timer("core.build_index." + name):
+                if snapshot_arrays and INDEX_SNAPSHOTS:
+                    arrays = read_index_snapshot(self.path, self._signature, self.version,
+                                                 len(self.credentials), snapshot_arrays)
+                    if arrays is not None:
+                        # Only the sorting is skipped; the rest is quick
+                        index.restore(self.credentials, arrays)
+                        return index
+                index.apply_changes(self.credentials, [])
+        finally:
+            if collecting:
+                gc.enable()
+        if snapshot_arrays:
+            self._snapshot_stale = True
+        return index
+
+    def save_index_snapshot(self):
+        """Bring the snapshot file up to date if an index in it was built or changed since.
+
+        Done when the vault is closed (or the program exits) rather than on every save,
+        so a run of adds pays for it once."""
+        if not self._snapshot_stale or not INDEX_SNAPSHOTS or self._signature is None:
+            return
+        with self._lock:
+            self._snapshot_stale = False
+            built = {type(index): index for index in self._indexes.values() if hasattr(index, "SNAPSHOT_ARRAYS")}
+            if not built:
+                return
+            # Arrays of indexes this run never built are still good if the vault hasn't
+            # changed since they were written, so they are kept
+            missing = [name for index_type in self.INDEXES.values()
+                       if hasattr(index_type, "SNAPSHOT_ARRAYS") and index_type not in built
+                       for name in index_type.SNAPSHOT_ARRAYS]
+            carried = None
+            if missing:
+                carried = read_index_snapshot(self.path, self._signature, self.version, len(self.credentials), missing)
+            try:
+                write_index_snapshot(self.path, self._signature, self.version, self.credentials,
+                                     list(built.values()), carried)
+            except OSError:
+                # Only startup time is lost without it
+                pass
+
+    def add_listener(self, callback):
+        """Call callback(added, removed) whenever the vault changes"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    @prof.timed("core.poll_changes")
+    def poll_changes(self):
+        """Check the file and return (added, removed) if it changed, otherwise None.
+
+        Only a stat() call is made unless the file was actually rewritten."""
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return None
+
+        with self._lock:
+            # Another thread may have caught up with the file while we waited
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return None
+            # Take the signature before reading, so a write that lands mid-read is caught next time
+            self._signature = signature
+            version, credentials_list = load_vault(self.path)
+            return self._update(version, credentials_list)
+
+    def saved(self, version, credentials_list):
+        """Take credentials_list, just written to the file as version, as the new contents.
+
+        Called by save_credentials while it still holds the lock, so the file can't have
+        changed again since; only a stat() is needed to recognise it on the next poll."""
+        with self._lock:
+            self._signature = self._stat_signature()
+            return self._update(version, credentials_list)
+
+    def _update(self, version, credentials_list):
+        credentials_list, added, removed = merge_credentials(self.credentials, credentials_list)
+        self.version = version
+        self.credentials = credentials_list
+
+        if not added and not removed:
+            return None
+        with prof.timer("core.update_indexes"):
+            for name, index in list(self._indexes.items()):
+                if hasattr(index, "SNAPSHOT_ARRAYS"):
+                    self._snapshot_stale = True
+                try:
+                    index.apply_changes(added, removed)
+                except Exception:
+                    # A half-updated index would give wrong answers. Dropping it means the
+                    # next use builds it again from self.credentials, or raises the error there.
+                    del self._indexes[name]
+        for listener in list(self.listeners):
+            listener(added, removed)
+        return added, removed
+
+# ---- Open vaults ----
+# Every vault file opened so far keeps its in-memory copy here (absolute path -> Vault),
+# so switching back to one only costs a stat(). The functions below work on
+# CREDENTIALS_FILE, which switch_vault() points at another file.
+_open_vaults = {}
+_open_vaults_lock = threading.Lock()
+
+# Vault files opened before, remembered between runs
+VAULTS_FILE = os.path.join(SCRIPT_DIR, "vaults.json")
+
+_loading_locks = {}  # absolute path -> lock held while that vault is first read
+
+def _open_vault(path):
+    """Return (vault, loaded) for an absolute path, reading the file if the vault isn't open yet.
+
+    loaded is True if the vault was read just now, so it doesn't need polling."""
+    with _open_vaults_lock:
+        vault = _open_vaults.get(path)
+        if vault is not None:
+            return vault, False
+        loading = _loading_locks.setdefault(path, threading.Lock())
+
+    # The file is read outside _open_vaults_lock, so different vaults can load at the same
+    # time; the per-path lock stops two threads reading the same one twice
+    with loading:
+        with _open_vaults_lock:
+            vault = _open_vaults.get(path)
+        if vault is None:
+            vault = Vault(path)
+            with _open_vaults_lock:
+                _open_vaults[path] = vault
+                _loading_locks.pop(path, None)
+    return vault, True
+
+def get_vault(path=None):
+    """Return the shared Vault for path (CREDENTIALS_FILE by default), brought up to date with the disk"""
+    vault, loaded = _open_vault(os.path.abspath(path or CREDENTIALS_FILE))
+    if not loaded:
+        vault.poll_changes()
+    return vault
+
+def close_vault(path):
+    """Forget the in-memory copy of a vault file, saving its index snapshot first"""
+    with _open_vaults_lock:
+        vault = _open_vaults.pop(os.path.abspath(path), None)
+    if vault is not None:
+        vault.save_index_snapshot()
+
+# Keeps the index snapshots of every open vault up to date for the next start
+@atexit.register
+def _save_index_snapshots():
+    for vault in list(_open_vaults.values()):
+        vault.save_index_snapshot()
+
+def vault_label(path):
+    """A short name for a vault file: its name without the .json"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+def known_vaults():
+    """Paths of the vault files to offer: the usual one, every one opened before and the current one"""
+    paths = [os.path.join(SCRIPT_DIR, "credentials.json")]
+    try:
+        with open(VAULTS_FILE, "r") as file:
+            paths += json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    paths.append(CREDENTIALS_FILE)
+
+    # Keep the first of any duplicates
+    unique = []
+    for path in map(os.path.abspath, paths):
+        if path not in unique:
+            unique.append(path)
+    return unique
+
+def switch_vault(path):
+    """Make path the vault that everything else works on and return its Vault.
+
+    The file is remembered in VAULTS_FILE; if it doesn't exist yet it is created on the first save."""
+    global CREDENTIALS_FILE
+    path = os.path.abspath(path)
+    paths = known_vaults()
+    if path not in paths:
+        with open(VAULTS_FILE, "w") as file:
+            json.dump(paths[1:] + [path], file, indent=4)
+    CREDENTIALS_FILE = path
+    return get_vault(path)
+
+# This function searches several vaults at the same time
+def search_all_vaults(search_term, paths=None, category=None, limit=None):
+    """Search every known vault (or the given paths) and return (vault label, credential) pairs.
+
+    Each vault is searched on its own thread, loading it first if it isn't open yet.
+    Results keep the order of the vaults, with at most limit matches from each one."""
+    paths = [os.path.abspath(path) for path in paths or known_vaults()]
+
+    # Polling runs the listeners of any vault that changed, and the GUI's listeners must run
+    # on its own thread, so the vaults that are already open are brought up to date here.
+    # The threads only load the vaults that aren't open yet and search a list of credentials.
+    with _open_vaults_lock:
+        open_vaults = {path: _open_vaults[path] for path in paths if path in _open_vaults}
+    for vault in open_vaults.values():
+        vault.poll_changes()
+
+    def search_one(path):
+        if not os.path.exists(path):
+            return []
+        vault = open_vaults.get(path) or _open_vault(path)[0]
+        return list(filter_credentials(vault.credentials, search_term, category, limit))
+
+    with ThreadPoolExecutor(max_workers=min(len(paths), 8) or 1) as pool:
+        found = list(pool.map(search_one, paths))
+    return [(vault_label(path), cred) for path, matches in zip(paths, found) for cred in matches]
+
+# This function returns one page of credentials in sorted order
+def list_credentials(sort_by="resource", descending=False, offset=0, limit=50, category=None):
+    """Return up to limit credentials, skipping the first offset, sorted by
+    "resource", "username" or "date_added", optionally from one category only.
+
+    The vault is kept sorted in memory, so this only touches the page asked for."""
+    return get_vault().sorted.page(sort_by, descending, offset, limit, category)
+
+# This function says how many credentials a listing has in total (for page counts)
+def count_credentials(category=None):
+    return get_vault().sorted.count(category)
+
+# This function lists the categories in use, in alphabetical order
+def list_categories():
+    return get_vault().sorted.category_names()
+
+# This function finds the passwords that should be changed, oldest first
+def due_for_rotation(max_age_days=ROTATION_DAYS, limit=None, now=None):
+    """Return credentials added more than max_age_days ago (all of them if it is None),
+    oldest first and at most limit of them. Entries without a readable date count as oldest."""
+    ages = get_vault().ages
+    if max_age_days is None:
+        return ages.oldest(limit)
+    cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+    return ages.added_before(cutoff, limit)
+
+# This function says how many whole days ago a credential was added, or None if we don't know
+def credential_age_days(cred, now=None):
+    added = parse_date_added(cred)
+    if added == datetime.min:
+        return None
+    return ((now or datetime.now()) - added).days
+
+# This function finds the saved credentials for a resource and username
+def find_credential(resource, username):
+    return get_vault().entries.find(resource, username)
+
+# This function collapses entries with the same resource and username into one
+def dedupe_credentials():
+    """Keep one row per (resource, username), holding the most recently added values.
+
+    Returns the number of rows removed."""
+    with vault_lock():
+        vault = get_vault()
+        if not vault.entries.duplicate_count():
+            return 0
+
+        # One pass: the first row for each account keeps its place, later rows overwrite it if newer
+        deduped = []
+        positions = {}
+        for cred in vault.credentials:
+            key = entry_key(cred["resource"], cred["username"])
+            if key not in positions:
+                positions[key] = len(deduped)
+                deduped.append(cred)
+            elif cred.get("date_added", "") >= deduped[positions[key]].get("date_added", ""):
+                deduped[positions[key]] = cred
+
+        removed = len(vault.credentials) - len(deduped)
+        save_credentials(deduped, expected_version=vault.version)
+        return removed
+
+# This function deletes every saved credential for a resource and username
+def delete_entry(resource, username):
+    """Delete the credentials for this resource and username and return them"""
+    with vault_lock():
+        vault = get_vault()
+        doomed = vault.entries.find(resource, username)
+        if not doomed:
+            return []
+        doomed_ids = {id(cred) for cred in doomed}
+        credentials_list = [cred for cred in vault.credentials if id(cred) not in doomed_ids]
+        save_credentials(credentials_list, expected_version=vault.version)
+        return doomed
+
+# This function adds a batch of credentials with a single save
+def import_credentials(records, upsert=True):
+    """Add credentials from a list of dictionaries and return (added, updated) counts.
+
+    With upsert=True records for an account that is already saved update it instead."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    added = updated = 0
+    with vault_lock():
+        vault = get_vault()
+        credentials_list = list(vault.credentials)
+        # Accounts from earlier in this batch, mapped to their position in credentials_list
+        positions = {}
+        # Where each saved credential sits, worked out once for the whole batch
+        saved_positions = None
+
+        for record in records:
+            new_credential = {
+                "username": record["username"],
+                "password": record.get("password", ""),
+                "resource": record["resource"],
+                "category": record.get("category") or "Uncategorized",
+                "date_added": record.get("date_added") or timestamp,
+            }
+            key = entry_key(new_credential["resource"], new_credential["username"])
+
+            position = positions.get(key)
+            if position is None and upsert:
+                existing = vault.entries.find(new_credential["resource"], new_credential["username"])
+                if existing:
+                    if saved_positions is None:
+                        saved_positions = {id(cred): i for i, cred in enumerate(vault.credentials)}
+                    position = saved_positions[id(existing[0])]
+
+            if upsert and position is not None:
+                credentials_list[position] = dict(credentials_list[position],
+                                                  password=new_credential["password"],
+                                                  date_added=new_credential["date_added"])
+                # A later record for the same account updates this row again
+                positions[key] = position
+                updated += 1
+            else:
+                positions[key] = len(credentials_list)
+                credentials_list.append(new_credential)
+                added += 1
+
+        if added or updated:
+            save_credentials(credentials_list, expected_version=vault.version)
+    return added, updated
+
+# This function finds the credentials that already use a password
+def find_password_reuse(password):
+    return get_vault().passwords.uses_of(password)
+
+# This function builds the reuse and strength report
+def password_report():
+    """Return {"reused": groups of credentials sharing a password,
+    "scores": (credential, entropy, strength) sorted weakest first}"""
+    index = get_vault().passwords
+    scores = sorted(index.scores(), key=lambda score: score[1])
+    return {"reused": index.reused_groups(), "scores": scores}
+
 # This function adds a new password - command line version
 def add_creds():
-    # First it gets the existing passwords
-    credentials_list = load_credentials()
-    
     # It collects all the details and stores them in a dictionary
     
     # Get username - keep asking until it gets something valid
@@ -49,7 +1085,26 @@ def add_creds():
     
     # Get the rest of the information
     password = input("What is the password? ")
+    
+    # Warn straight away if this password is already used somewhere else
+    reused = find_password_reuse(password)
+    if reused:
+        print(f"Warning: this password is already used for {len(reused)} other credential(s):")
+        for cred in reused:
+            print(f"   {cred['resource']} ({cred['username']})")
+    
     resource = input("What is the resource or website? ")
+    
+    # If this account is already saved, offer to update it instead of adding it twice
+    update_existing = False
+    if find_credential(resource, username):
+        answer = input(f"{resource} ({username}) is already saved. Update its password? (y/n): ")
+        if answer.strip().lower() != "y":
+            print("Nothing was changed.")
+            print()
+            return
+        update_existing = True
+    
     # Added categories to help organize passwords
     category = input("What category does this belong to? (e.g., Work, Personal, Finance): ")
     
@@ -66,22 +1121,20 @@ def add_creds():
         "date_added": timestamp
     }
     
-    # Add this new credential to our list
+    # Add this new credential to the end of our list and save it
     # Lists are great for collecting multiple items - we can easily add, remove, and iterate through them
-    credentials_list.append(new_credential)
-    
-    # Save everything back to the file
-    save_credentials(credentials_list)
+    # The file is re-read under the lock, so entries added meanwhile by the GUI are kept
+    _store_credential(new_credential, upsert=update_existing)
     
     print("Your data has been saved.")
     print()  # Empty line for better readability
 
 # Function for the GUI to add credentials
-def add_credential(username, password, resource, category):
-    """Add a new credential using provided values"""
-    # Get existing credentials
-    credentials_list = load_credentials()
-    
+def add_credential(username, password, resource, category, upsert=False):
+    """Add a new credential using provided values.
+
+    With upsert=True an existing entry for the same resource and username
+    is updated in place instead of adding a duplicate."""
     # Create timestamp
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
@@ -95,45 +1148,46 @@ def add_credential(username, password, resource, category):
     }
     
     # Add to list and save
-    credentials_list.append(new_credential)
-    result = save_credentials(credentials_list)
+    result = _store_credential(new_credential, upsert=upsert)
     
     return result
 
+# How many credentials view_creds() shows before asking to continue
+VIEW_PAGE_SIZE = 20
+
 # This function displays all saved passwords to the user - command line version
 def view_creds():
-    # Get the saved passwords
-    credentials_list = load_credentials()
-    
     # Check if you have any passwords saved
-    if credentials_list:
-        # Organize credentials by category
-        # We'll use a dictionary where each key is a category and the value is a list of credentials
-        categories = {}
-        
-        # Loop through each credential and organize by category
-        for cred in credentials_list:
-            # Get the category or use "Uncategorized" if none was specified
-            category = cred.get("category", "Uncategorized")
+    if count_credentials():
+        # Show one category at a time, a page at a time, sorted by resource.
+        # list_credentials() hands out one page without going through the rest of the vault.
+        # The lines of a page are written in one go, which is much faster than
+        # lots of small print() calls when the output is piped somewhere
+        interactive = sys.stdin.isatty() and sys.stdout.isatty()
+        for category in list_categories():
+            total = count_credentials(category)
+            sys.stdout.write(f"\n--- {category.upper()} ---\n")  # Section header for each category
             
-            # If this is the first credential in this category, create a new list
-            if category not in categories:
-                categories[category] = []
+            offset = 0
+            while offset < total:
+                page = list_credentials("resource", offset=offset, limit=VIEW_PAGE_SIZE, category=category)
+                lines = []
+                # Display each credential in this category
+                for i, cred in enumerate(page, offset + 1):  # Start counting from 1 instead of 0
+                    lines.append(f"{i}. Resource: {cred['resource']}")
+                    lines.append(f"   Username: {cred['username']}")
+                    lines.append(f"   Password: {cred['password']}")
+                    lines.append(f"   Added on: {cred.get('date_added', 'Unknown')}")
+                    lines.append("")  # Empty line between entries
+                sys.stdout.write("\n".join(lines) + "\n")
+                offset += len(page)
                 
-            # Adds this credential to the right category list
-            categories[category].append(cred)
-        
-        # Now display everything, grouped by category
-        for category, creds in categories.items():
-            print(f"\n--- {category.upper()} ---")  # Section header for each category
-            
-            # Display each credential in this category
-            for i, cred in enumerate(creds, 1):  # Start counting from 1 instead of 0
-                print(f"{i}. Resource: {cred['resource']}")
-                print(f"   Username: {cred['username']}")
-                print(f"   Password: {cred['password']}")
-                print(f"   Added on: {cred.get('date_added', 'Unknown')}")
-                print()  # Empty line between entries
+                # Let people read a long category before the next page scrolls past
+                if interactive and offset < total:
+                    answer = input(f"-- {offset} of {total} shown. Enter for more, q to stop: ")
+                    if answer.strip().lower() == "q":
+                        print()
+                        return
     else:
         print("No credentials stored yet.")
         print()
@@ -179,23 +1233,23 @@ def search_creds():
         print()
 
 # Function for the GUI to search credentials
+@prof.timed("core.search_credentials")
 def search_credentials(search_term):
     """Search for credentials matching the search term"""
-    credentials_list = load_credentials()
-    matches = []
-    
-    for cred in credentials_list:
-        if (search_term.lower() in cred["resource"].lower() or 
-            search_term.lower() in cred["username"].lower() or 
-            search_term.lower() in cred.get("category", "").lower()):
-            matches.append(cred)
-    
-    return matches
+    return list(iter_search(search_term))
+
+# This function finds matching passwords one at a time, so the first ones can be shown straight away
+def iter_search(search_term, limit=None, cancel=None):
+    """Yield credentials whose resource, username or category contains search_term.
+
+    Stops after limit matches, or soon after cancel (a threading.Event) is set.
+    The search runs over the vault as it was when it started, even if it changes meanwhile."""
+    return filter_credentials(get_vault().credentials, search_term, limit=limit, cancel=cancel)
 
 # This function lets users delete passwords they don't need anymore - command line version
 def delete_creds():
-    # Get our saved passwords
-    credentials_list = load_credentials()
+    # Get our saved passwords, remembering which version of the file we showed
+    version, credentials_list = load_vault()
     
     # Check if we have any passwords saved
     if not credentials_list:
@@ -229,27 +1283,38 @@ def delete_creds():
             # This happens if they enter something that's not a number
             print("Please enter a valid number.")
     
-    # Remove the selected credential
-    # pop() is used to remove the item and get a reference to it
-    deleted_cred = credentials_list.pop(selection - 1)  # -1 because our list is 0-indexed
-    
-    # Save the updated list
-    save_credentials(credentials_list)
+    # Remove the selected credential, unless the list changed while we were waiting for input
+    try:
+        deleted_cred = delete_credential(selection - 1, expected_version=version)  # -1 because our list is 0-indexed
+    except VaultConflictError:
+        print("The credentials were changed by another program. Please try again.")
+        print()
+        return
     
     # Confirm the deletion to the user
     print(f"Deleted credentials for {deleted_cred['resource']} ({deleted_cred['username']}).")
     print()
 
 # Function for the GUI to delete a credential
-def delete_credential(index):
-    """Delete a credential by index"""
-    credentials_list = load_credentials()
-    
-    if 0 <= index < len(credentials_list):
-        deleted_cred = credentials_list.pop(index)
-        save_credentials(credentials_list)
-        return deleted_cred
-    
+def delete_credential(index, expected_version=None):
+    """Delete a credential by index.
+
+    Pass the version the index was taken from to get a VaultConflictError
+    instead of deleting the wrong entry if the vault changed since."""
+    with vault_lock():
+        vault = get_vault()
+        version = vault.version
+        if expected_version is not None and version != expected_version:
+            raise VaultConflictError(
+                f"Vault changed on disk (version {version}, expected {expected_version})")
+
+        credentials_list = list(vault.credentials)
+        if 0 <= index < len(credentials_list):
+            # pop() is used to remove the item and get a reference to it
+            deleted_cred = credentials_list.pop(index)
+            save_credentials(credentials_list, expected_version=version)
+            return deleted_cred
+
     return None
 
 # Function for the GUI to get credentials organized by category
@@ -267,13 +1332,627 @@ def get_credentials_by_category():
     
     return categories
 
+# ---- Version history ----
+# Every save is recorded in credentials.json.history/ so deleted or overwritten credentials
+# can be brought back. Keeping a full copy per save would be far too big, so history is split
+# into segments: each starts with a full snapshot and is followed by one small delta line per
+# save (what was added and removed, and where). Going back to any version means loading one
+# snapshot and replaying the deltas after it, never the whole history.
+HISTORY_ENABLED = True
+# Old segments are deleted once the history folder grows past this size
+HISTORY_MAX_BYTES = 50 * 1024 * 1024
+# A new snapshot is started after this many deltas, or once the deltas outgrow the snapshot
+HISTORY_SNAPSHOT_EVERY = 100
+# ...but small vaults are not re-snapshotted before their deltas reach this size
+HISTORY_MIN_DELTA_BYTES = 64 * 1024
+
+def history_dir(path=None):
+    return (path or CREDENTIALS_FILE) + ".history"
+
+# Segments are named after the version of their snapshot, zero padded so they sort in order
+def _segment_files(directory, snapshot_version):
+    base = os.path.join(directory, f"{snapshot_version:012d}")
+    return base + ".snapshot.json", base + ".deltas.jsonl"
+
+def _segment_versions(directory):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(int(name.split(".")[0]) for name in os.listdir(directory) if name.endswith(".snapshot.json"))
+
+# Like merge_credentials, but also remembers positions so a replay rebuilds the exact same order.
+# Rows are matched by identity against old_list, like merge_credentials, so identical rows are
+# never mixed up. Returns None when rows that were kept changed order (dedupe can do that):
+# a delta cannot describe that, so the caller stores a snapshot instead.
+def _positioned_diff(old_list, new_list):
+    # Most saves change a few rows somewhere in the middle. Skipping the rows that are the
+    # very same objects at both ends leaves only that part to compare.
+    start = 0
+    shortest = min(len(old_list), len(new_list))
+    while start < shortest and old_list[start] is new_list[start]:
+        start += 1
+    old_end, new_end = len(old_list), len(new_list)
+    while old_end > start and new_end > start and old_list[old_end - 1] is new_list[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+    old_middle = old_list[start:old_end]
+
+    merged, added_creds, removed_creds = merge_credentials(old_middle, new_list[start:new_end])
+    added_ids = {id(cred) for cred in added_creds}
+    removed_ids = {id(cred) for cred in removed_creds}
+
+    kept_in_old_order = [cred for cred in old_middle if id(cred) not in removed_ids]
+    kept_in_new_order = [cred for cred in merged if id(cred) not in added_ids]
+    if any(old is not new for old, new in zip(kept_in_old_order, kept_in_new_order)):
+        return None
+
+    added = [[start + position, cred] for position, cred in enumerate(merged) if id(cred) in added_ids]
+    removed = [start + position for position, cred in enumerate(old_middle) if id(cred) in removed_ids]
+
+    # Replaying the delta must give back exactly the list that was saved
+    replayed = list(old_list)
+    _apply_delta(replayed, {"added": added, "removed": removed})
+    expected = new_list[:start] + merged + new_list[new_end:]
+    if len(replayed) != len(expected) or any(old is not new for old, new in zip(replayed, expected)):
+        return None
+    return added, removed
+
+# Above this many changes, one pass over the list beats deleting and inserting one at a time
+_DELTA_REBUILD_THRESHOLD = 64
+
+def _apply_delta(credentials_list, delta):
+    if len(delta["removed"]) + len(delta["added"]) <= _DELTA_REBUILD_THRESHOLD:
+        # Remove from the back so earlier positions stay valid, then insert front to back
+        for position in sorted(delta["removed"], reverse=True):
+            del credentials_list[position]
+        for position, cred in delta["added"]:
+            credentials_list.insert(position, cred)
+        return
+
+    removed = set(delta["removed"])
+    kept = iter([cred for position, cred in enumerate(credentials_list) if position not in removed])
+    result = []
+    for position, cred in delta["added"]:
+        while len(result) < position:
+            result.append(next(kept))
+        result.append(cred)
+    result.extend(kept)
+    credentials_list[:] = result
+
+# The history holds every password ever saved, deleted ones included, so only the owner
+# may read it - like the vault itself, which mkstemp creates readable by its owner only
+def _write_json(file_path, data):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix=".history-")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, separators=(",", ":"))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def _append_line(file_path, line):
+    with open(os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600), "a") as file:
+        file.write(line)
+
+# Called by save_credentials (with the vault lock held) for every save
+def record_history(old_list, old_version, new_list, new_version, path=None):
+    directory = history_dir(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # Folders made before this was private keep whatever the umask gave them otherwise
+    os.chmod(directory, 0o700)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    segments = _segment_versions(directory)
+    if not segments:
+        # The very first segment starts from what was there before this save
+        snapshot_file, deltas_file = _segment_files(directory, old_version)
+        _write_json(snapshot_file, {"version": old_version, "time": timestamp, "credentials": old_list})
+        segments = [old_version]
+
+    snapshot_file, deltas_file = _segment_files(directory, segments[-1])
+    delta_count = 0
+    if os.path.exists(deltas_file):
+        with open(deltas_file, "rb") as file:
+            delta_count = sum(1 for _ in file)
+
+    # Start a fresh segment when replaying this one would cost more than loading a snapshot,
+    # or when the save reordered rows in a way a delta can't record
+    diff = None
+    if not (delta_count >= HISTORY_SNAPSHOT_EVERY or
+            (os.path.exists(deltas_file) and
+             os.path.getsize(deltas_file) > max(os.path.getsize(snapshot_file), HISTORY_MIN_DELTA_BYTES))):
+        diff = _positioned_diff(old_list, new_list)
+    if diff is None:
+        snapshot_file, deltas_file = _segment_files(directory, new_version)
+        _write_json(snapshot_file, {"version": new_version, "time": timestamp, "credentials": new_list})
+    else:
+        added, removed = diff
+        delta = {"version": new_version, "time": timestamp, "added": added, "removed": removed}
+        _append_line(deltas_file, json.dumps(delta, separators=(",", ":")) + "\n")
+
+    prune_history(HISTORY_MAX_BYTES, path)
+
+def prune_history(max_bytes, path=None):
+    """Delete the oldest segments until the history fits in max_bytes. The newest one is always kept."""
+    directory = history_dir(path)
+    segments = _segment_versions(directory)
+
+    sizes = []
+    for snapshot_version in segments:
+        size = sum(os.path.getsize(file_path) for file_path in _segment_files(directory, snapshot_version)
+                   if os.path.exists(file_path))
+        sizes.append(size)
+
+    total = sum(sizes)
+    removed = 0
+    for snapshot_version, size in zip(segments[:-1], sizes[:-1]):
+        if total <= max_bytes:
+            break
+        for file_path in _segment_files(directory, snapshot_version):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        total -= size
+        removed += 1
+    return removed
+
+def list_history(path=None):
+    """Return one dictionary per recorded version, oldest first"""
+    directory = history_dir(path)
+    entries = []
+    for snapshot_version in _segment_versions(directory):
+        snapshot_file, deltas_file = _segment_files(directory, snapshot_version)
+        with open(snapshot_file, "r") as file:
+            snapshot = json.load(file)
+        entries.append({"version": snapshot["version"], "time": snapshot["time"],
+                        "snapshot": True, "count": len(snapshot["credentials"])})
+        if os.path.exists(deltas_file):
+            with open(deltas_file, "r") as file:
+                for line in file:
+                    delta = json.loads(line)
+                    entries.append({"version": delta["version"], "time": delta["time"], "snapshot": False,
+                                    "added": len(delta["added"]), "removed": len(delta["removed"])})
+    return entries
+
+def credentials_at_version(version, path=None):
+    """Rebuild the credentials list as it was at this version, or return None if it is not in the history"""
+    directory = history_dir(path)
+    candidates = [snapshot_version for snapshot_version in _segment_versions(directory) if snapshot_version <= version]
+    if not candidates:
+        return None
+
+    snapshot_file, deltas_file = _segment_files(directory, candidates[-1])
+    with open(snapshot_file, "r") as file:
+        credentials_list = json.load(file)["credentials"]
+    if candidates[-1] == version:
+        return credentials_list
+
+    if os.path.exists(deltas_file):
+        with open(deltas_file, "r") as file:
+            for line in file:
+                delta = json.loads(line)
+                if delta["version"] > version:
+                    break
+                _apply_delta(credentials_list, delta)
+                if delta["version"] == version:
+                    return credentials_list
+    return None
+
+def restore_version(version):
+    """Put the vault back the way it was at a version. The restore is itself a new version,
+    so it can be undone the same way. Returns False if that version is not in the history."""
+    with vault_lock():
+        credentials_list = credentials_at_version(version)
+        if credentials_list is None:
+            return False
+        return save_credentials(credentials_list)
+
+# ---- Breached password audit ----
+# The breach corpus is a sorted file of SHA-1 hashes, one per line ("HASH" or "HASH:COUNT"),
+# like the Pwned Passwords download. It is far too big to load, so we memory-map it and
+# binary search. build_breach_index() can turn it into a compact binary file of raw
+# 20-byte digests once, which is less than half the size and faster to search.
+BREACH_INDEX_MAGIC = b"PWMSHA1\0"
+SHA1_SIZE = 20
+
+# Below this many distinct passwords starting worker processes costs more than it saves
+AUDIT_PARALLEL_THRESHOLD = 5000
+
+# This function converts a sorted text hash file into the compact binary form
+def build_breach_index(text_path, index_path):
+    count = 0
+    with open(text_path, "rb") as source, open(index_path, "wb") as target:
+        target.write(BREACH_INDEX_MAGIC)
+        for line in source:
+            line = line.strip()
+            if line:
+                target.write(bytes.fromhex(line[:40].decode("ascii")))
+                count += 1
+    return count
+
+# Read-only view of a breach corpus file in either format
+class BreachCorpus:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            # mmap refuses empty files, and an empty corpus matches nothing anyway
+            self._map = b""
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.binary = self._map[:len(BREACH_INDEX_MAGIC)] == BREACH_INDEX_MAGIC
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def contains(self, digest):
+        """Check whether a raw 20-byte SHA-1 digest is in the corpus"""
+        if self.binary:
+            return self._contains_binary(digest)
+        return self._contains_text(digest.hex().upper().encode("ascii"))
+
+    def _contains_binary(self, digest):
+        data = self._map
+        header = len(BREACH_INDEX_MAGIC)
+        lo, hi = 0, (len(data) - header) // SHA1_SIZE
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = header + mid * SHA1_SIZE
+            candidate = data[offset:offset + SHA1_SIZE]
+            if candidate == digest:
+                return True
+            if candidate < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return False
+
+    def _contains_text(self, hex_digest):
+        # Lines have different lengths, so we search byte offsets and snap back to the
+        # start of the line we landed in. "lo" always sits at the start of a line.
+        data = self._map
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            newline = data.rfind(b"\n", lo, mid)
+            start = lo if newline == -1 else newline + 1
+            candidate = data[start:start + 40].upper()
+            if candidate == hex_digest:
+                return True
+            if candidate < hex_digest:
+                end = data.find(b"\n", start)
+                if end == -1:
+                    return False
+                lo = end + 1
+            else:
+                hi = start
+        return False
+
+# Runs in a worker process: hash a batch of passwords and return the ones in the corpus
+def _find_breached(corpus_path, passwords):
+    with BreachCorpus(corpus_path) as corpus:
+        return [password for password in passwords
+                if corpus.contains(hashlib.sha1(password.encode("utf-8")).digest())]
+
+# This function checks every stored password against a local breach corpus
+def audit_breached_passwords(corpus_path, credentials_list=None, workers=None):
+    """Return the credentials whose password appears in the breach corpus.
+
+    Nothing is sent over the network; corpus_path is a local text or binary hash file."""
+    if credentials_list is None:
+        credentials_list = load_credentials()
+
+    # Each distinct password only needs to be hashed and looked up once
+    passwords = list({cred["password"] for cred in credentials_list if cred.get("password")})
+
+    if len(passwords) < AUDIT_PARALLEL_THRESHOLD or workers == 1:
+        breached = set(_find_breached(corpus_path, passwords))
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunk_size = -(-len(passwords) // (workers * 4))  # A few chunks per worker evens out the load
+        chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+        breached = set()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for found in pool.map(_find_breached, [corpus_path] * len(chunks), chunks):
+                breached.update(found)
+
+    return [cred for cred in credentials_list if cred.get("password") in breached]
+
+# Command line version of the breach audit
+def audit_creds():
+    corpus_path = input("Path to the breached password hash file: ").strip()
+    if not os.path.exists(corpus_path):
+        print("That file does not exist.")
+        print()
+        return
+
+    matches = audit_breached_passwords(corpus_path)
+    if matches:
+        print(f"\n{len(matches)} credentials use a breached password:")
+        for cred in matches:
+            print(f"- {cred['resource']} ({cred['username']})")
+        print()
+    else:
+        print("No breached passwords found.")
+        print()
+
+# Command line version of the reuse and strength report
+def report_creds():
+    report = password_report()
+    if not report["scores"]:
+        print("No credentials stored yet.")
+        print()
+        return
+
+    if report["reused"]:
+        print(f"\n--- {len(report['reused'])} PASSWORDS USED MORE THAN ONCE ---")
+        for i, group in enumerate(report["reused"], 1):
+            print(f"{i}. Shared by: " + ", ".join(f"{cred['resource']} ({cred['username']})" for cred in group))
+    else:
+        print("\nNo passwords are reused.")
+
+    print("\n--- PASSWORD STRENGTH (weakest first) ---")
+    for cred, entropy, strength in report["scores"]:
+        print(f"{strength:<11} {entropy:>6} bits  {cred['resource']} ({cred['username']})")
+    print()
+
+# Command line version of the rotation queue
+def rotation_creds():
+    due = due_for_rotation()
+    if not due:
+        print(f"No passwords are older than {ROTATION_DAYS} days.")
+        print()
+        return
+
+    print(f"\n--- {len(due)} PASSWORDS OLDER THAN {ROTATION_DAYS} DAYS (oldest first) ---")
+    now = datetime.now()
+    for cred in due:
+        age = credential_age_days(cred, now)
+        age = "unknown age" if age is None else f"{age} days"
+        print(f"{age:>12}  {cred['resource']} ({cred['username']})")
+    print()
+
+# Command line version of removing duplicate entries
+def dedupe_creds():
+    removed = dedupe_credentials()
+    if removed:
+        print(f"Removed {removed} duplicate entries.")
+    else:
+        print("No duplicate entries found.")
+    print()
+
+# ---- Scriptable command line ----
+# "python password_manager_core.py list --category Work --limit 10" and friends.
+# Results are written as JSON lines (one credential per line) so other programs can read them;
+# messages for people go to stderr so they never get mixed into the results.
+
+# Credentials in a category and/or matching a search term, found lazily so a limit can stop the scan early
+def filter_credentials(credentials_list, search_term=None, category=None, limit=None, cancel=None):
+    results = iter(credentials_list)
+    if cancel is not None:
+        results = _until_cancelled(results, cancel)
+    if prof.enabled:
+        results = _counted(results, "records_scanned")
+    if category is not None:
+        category = category.lower()
+        results = (cred for cred in results if cred.get("category", "Uncategorized").lower() == category)
+    if search_term is not None:
+        search_term = search_term.lower()
+        results = (cred for cred in results
+                   if search_term in cred["resource"].lower()
+                   or search_term in cred["username"].lower()
+                   or search_term in cred.get("category", "").lower())
+    if limit is not None:
+        results = itertools.islice(results, max(limit, 0))
+    return results
+
+# How many records a search goes through between looks at its cancel flag
+CANCEL_CHECK_EVERY = 1024
+
+# Passes items through until cancel is set, checking it every CANCEL_CHECK_EVERY items
+def _until_cancelled(items, cancel):
+    while not cancel.is_set():
+        chunk = list(itertools.islice(items, CANCEL_CHECK_EVERY))
+        yield from chunk
+        if len(chunk) < CANCEL_CHECK_EVERY:
+            return
+
+# Passes items through while counting them; only used while profiling
+def _counted(items, counter):
+    for item in items:
+        prof.count(counter)
+        yield item
+
+# Credentials for a resource, optionally narrowed down to one username
+def get_credentials(resource, username=None):
+    if username is not None:
+        return find_credential(resource, username)
+    return get_vault().entries.find_resource(resource)
+
+# Write results as JSON lines through one big buffer instead of a print() per line
+def _write_json_lines(records, output):
+    output.writelines(json.dumps(record) + "\n" for record in records)
+
+def _read_records(file):
+    """Read credentials from a JSON array or JSON lines file"""
+    text = file.read()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="password_manager_core.py",
+        description="Password manager. Run without arguments for the interactive menu.")
+    parser.add_argument("--profile", action="store_true", help="print timings and counters on exit")
+    parser.add_argument("--vault", help="vault file to use instead of credentials.json")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add a credential")
+    add.add_argument("--resource", required=True)
+    add.add_argument("--username", required=True)
+    password = add.add_mutually_exclusive_group(required=True)
+    password.add_argument("--password")
+    password.add_argument("--password-stdin", action="store_true", help="read the password from stdin")
+    add.add_argument("--category", default="")
+    add.add_argument("--upsert", action="store_true", help="update the password if the account exists")
+
+    get = commands.add_parser("get", help="get the credentials for a resource")
+    get.add_argument("resource")
+    get.add_argument("--username")
+
+    search = commands.add_parser("search", help="search resource, username and category")
+    search.add_argument("term")
+    search.add_argument("--all-vaults", action="store_true",
+                        help="search every known vault at once; each result gets a \"vault\" field")
+
+    list_command = commands.add_parser("list", help="list credentials")
+
+    for command in (search, list_command):
+        command.add_argument("--category", help="only this category")
+        command.add_argument("--limit", type=int, help="stop after this many results")
+
+    delete = commands.add_parser("delete", help="delete the credentials for an account")
+    delete.add_argument("--resource", required=True)
+    delete.add_argument("--username", required=True)
+
+    import_command = commands.add_parser("import", help="import a JSON or JSON lines file")
+    import_command.add_argument("file", help="file to read, or - for stdin")
+    import_command.add_argument("--no-upsert", action="store_true", help="always add, even if the account exists")
+
+    export = commands.add_parser("export", help="export every credential as JSON lines")
+    export.add_argument("file", nargs="?", default="-", help="file to write, or - for stdout (default)")
+
+    rotation = commands.add_parser("rotation", help="list passwords due to be changed, oldest first")
+    rotation.add_argument("--days", type=int, default=ROTATION_DAYS,
+                          help=f"older than this many days (default {ROTATION_DAYS})")
+    rotation.add_argument("--all", action="store_true", help="list every credential, oldest first")
+    rotation.add_argument("--limit", type=int, help="only the oldest N")
+
+    commands.add_parser("history", help="list the versions that can be restored")
+
+    restore = commands.add_parser("restore", help="put the vault back the way it was at a version")
+    restore.add_argument("version", type=int)
+
+    return parser
+
+def run_command(argv, output=None):
+    """Run one subcommand and return the exit code"""
+    global CREDENTIALS_FILE
+    args = build_parser().parse_args(argv)
+    if args.vault:
+        CREDENTIALS_FILE = os.path.abspath(args.vault)
+    own_output = output is None
+    if own_output:
+        # A large buffer on top of stdout lets a big listing go out at disk speed
+        output = open(sys.stdout.fileno(), "w", buffering=1 << 16, encoding="utf-8", closefd=False)
+
+    try:
+        # Anything print()ed along the way (like "Credentials saved") is for people, not scripts
+        with contextlib.redirect_stdout(sys.stderr):
+            return _run_parsed_command(args, output)
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into "head"); that is not an error
+        return 0
+    finally:
+        if own_output:
+            try:
+                output.close()
+            except BrokenPipeError:
+                pass
+
+def _run_parsed_command(args, output):
+    if args.command == "add":
+        password = sys.stdin.readline().rstrip("\n") if args.password_stdin else args.password
+        existing = find_credential(args.resource, args.username)
+        if existing and not args.upsert:
+            print(f"{args.resource} ({args.username}) is already saved; use --upsert to update it.", file=sys.stderr)
+            return 1
+        add_credential(args.username, password, args.resource, args.category, upsert=args.upsert)
+        _write_json_lines([{"status": "updated" if existing else "added",
+                            "resource": args.resource, "username": args.username}], output)
+        return 0
+
+    if args.command == "get":
+        matches = get_credentials(args.resource, args.username)
+        _write_json_lines(matches, output)
+        return 0 if matches else 1
+
+    if args.command == "search" and args.all_vaults:
+        results = search_all_vaults(args.term, category=args.category, limit=args.limit)
+        _write_json_lines((dict(cred, vault=label) for label, cred in results), output)
+        return 0
+
+    if args.command in ("search", "list"):
+        search_term = args.term if args.command == "search" else None
+        _write_json_lines(filter_credentials(get_vault().credentials, search_term, args.category, args.limit), output)
+        return 0
+
+    if args.command == "delete":
+        deleted = delete_entry(args.resource, args.username)
+        _write_json_lines(deleted, output)
+        return 0 if deleted else 1
+
+    if args.command == "import":
+        if args.file == "-":
+            records = _read_records(sys.stdin)
+        else:
+            with open(args.file, "r", encoding="utf-8") as file:
+                records = _read_records(file)
+        added, updated = import_credentials(records, upsert=not args.no_upsert)
+        _write_json_lines([{"status": "imported", "added": added, "updated": updated}], output)
+        return 0
+
+    if args.command == "rotation":
+        now = datetime.now()
+        due = due_for_rotation(None if args.all else args.days, args.limit, now)
+        _write_json_lines((dict(cred, age_days=credential_age_days(cred, now)) for cred in due), output)
+        return 0
+
+    if args.command == "history":
+        _write_json_lines(list_history(), output)
+        return 0
+
+    if args.command == "restore":
+        if not restore_version(args.version):
+            print(f"Version {args.version} is not in the history.", file=sys.stderr)
+            return 1
+        _write_json_lines([{"status": "restored", "version": args.version}], output)
+        return 0
+
+    if args.command == "export":
+        credentials_list = get_vault().credentials
+        if args.file == "-":
+            _write_json_lines(credentials_list, output)
+        else:
+            with open(args.file, "w", buffering=1 << 16, encoding="utf-8") as file:
+                _write_json_lines(credentials_list, file)
+        return 0
+
 # This is the main function that runs the program
-def main():
+def main(argv=None):
+    # With arguments we run a single subcommand instead of the menu
+    if argv is None:
+        argv = sys.argv[1:]
+    # --profile works with the menu and with every subcommand
+    if "--profile" in argv:
+        argv = [arg for arg in argv if arg != "--profile"]
+        prof.enable(dump_at_exit=True)
+    if argv:
+        return run_command(argv)
+    
     # Keep running until the user chooses to exit
     while True:
         # Show the menu and get the user's choice
         menu()
-        choice = input("Enter your choice (1/2/3/4/5): ")
+        choice = input("Enter your choice (1-9): ")
         
         # Do different things based on what they chose
         if choice == "1":
@@ -287,6 +1966,14 @@ def main():
         elif choice == "5":
             print("Exiting the program. Cheers mate!")
             break  # Exit the loop, ending the program
+        elif choice == "6":
+            audit_creds()  # Check passwords against a breach list
+        elif choice == "7":
+            report_creds()  # Find reused and weak passwords
+        elif choice == "8":
+            dedupe_creds()  # Collapse duplicate entries
+        elif choice == "9":
+            rotation_creds()  # Passwords that are getting old
         else:
             # If they entered something invalid
             print("Invalid choice, choose a valid option.")
@@ -309,8 +1996,12 @@ def menu():
     print("3. Search credentials")     # Added this feature to make finding things easier
     print("4. Delete credentials")     # Added this so users can remove old entries
     print("5. Exit program")
+    print("6. Audit passwords against a breach list")
+    print("7. Password reuse and strength report")
+    print("8. Remove duplicate entries")
+    print("9. Passwords due for rotation")
 
 # This makes sure the program only runs 
 # when executed directly not when imported by another program
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
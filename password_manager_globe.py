@@ -0,0 +1,204 @@
+# Spinning ASCII Earth - the globe in the corner of the GUI, without the GUI
+#
+# Renders frames into NumPy RGB arrays (height x width x 3), so they can be timed, saved or
+# shown by anything: the Tk window turns them into images, and the command line can write a
+# whole turn of the globe to a file:
+#
+#     python password_manager_globe.py --frames 120 --output earth.gif
+#     python password_manager_globe.py --frames 300 --bench
+#
+# Only pygame's font module is used, so no window or display is needed. The SDL drivers
+# default to "dummy" in case something asks for one anyway.
+import os
+import sys
+import time
+import argparse
+from math import pi
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame as pg
+import password_manager_profile as prof
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EARTH_FILE = os.path.join(SCRIPT_DIR, "earth_W140_H35.txt")
+
+# The ASCII map is MAP_WIDTH x MAP_HEIGHT characters wrapped around the sphere
+MAP_WIDTH = 139
+MAP_HEIGHT = 34
+
+# How far the globe turns per frame in the GUI (radians)
+SPIN_STEP = 0.05
+
+BACKGROUND = (0, 0, 50)
+PLACEHOLDER_BACKGROUND = (10, 10, 60)
+LAND_COLOUR = (0, 255, 0)
+
+# This function writes a simple round "map" when the real Earth file is missing
+def create_placeholder_earth_file(file_path):
+    earth_art = []
+    for y in range(MAP_HEIGHT):
+        line = ""
+        for x in range(MAP_WIDTH):
+            dx, dy = x - MAP_WIDTH // 2, y - MAP_HEIGHT // 2
+            distance = (dx**2 + dy**2)**0.5
+
+            if distance < MAP_WIDTH // 4:
+                if (x + y) % 7 == 0:
+                    line += "#"  # Continents
+                else:
+                    line += "~"  # Oceans
+            else:
+                line += " "
+        earth_art.append(line)
+
+    with open(file_path, "w") as file:
+        file.write("\n".join(earth_art))
+    print(f"Created placeholder {file_path} file.")
+
+# This function reads the Earth map as one long string, making a placeholder if needed
+def load_earth_map(file_path=EARTH_FILE):
+    """Return the map characters, or None if there is no map and none could be made"""
+    try:
+        if not os.path.exists(file_path):
+            print(f"Earth file not found at: {file_path}")
+            create_placeholder_earth_file(file_path)
+        with open(file_path, "r") as file:
+            return file.read().replace("\n", "")
+    except OSError as e:
+        print(f"Error creating placeholder Earth file: {e}")
+        return None
+
+class GlobeRenderer:
+    def __init__(self, width=150, height=150, map_file=EARTH_FILE):
+        self.width = width
+        self.height = height
+        self.R = width // 4  # Radius scaled to the surface size
+
+        # Fonts are the only part of pygame we need, so there is no pg.init() and no window
+        pg.font.init()
+        self.font = pg.font.SysFont("arial", 6)
+        self.surface = pg.Surface((width, height))
+
+        chars = load_earth_map(map_file)
+        self.loaded = chars is not None
+        if not self.loaded:
+            return
+
+        # One point on the sphere per map character, going down the latitudes and around
+        # the longitudes. The map is drawn back to front, so point i shows character -1 - i.
+        lat = np.repeat(np.arange(MAP_HEIGHT + 1) * (pi / MAP_HEIGHT), MAP_WIDTH + 1)
+        lon = np.tile(np.arange(MAP_WIDTH + 1) * (2 * pi / MAP_WIDTH), MAP_HEIGHT + 1)
+        self.xyz = np.round(np.column_stack((self.R * np.sin(lat) * np.cos(lon),
+                                             self.R * np.sin(lat) * np.sin(lon),
+                                             self.R * np.cos(lat))), 2)
+        self.center = self.xyz.mean(axis=0)
+
+        # The top and bottom rows of the map are never drawn (they squash into the poles)
+        first, last = MAP_WIDTH, min(MAP_WIDTH * MAP_HEIGHT - MAP_WIDTH, len(chars))
+        inverted_chars = chars[::-1]
+        self.drawn = np.arange(first, last)
+        self.drawn_chars = [inverted_chars[i] for i in self.drawn]
+
+        # Rendering the same few characters thousands of times a frame is the slow part,
+        # so each one is rendered once here and only copied onto the frame afterwards
+        self.glyphs = {char: self.font.render(char, False, LAND_COLOUR) for char in set(self.drawn_chars)}
+
+    @prof.timed("globe.render")
+    def render(self, spin=0.0):
+        """Return the globe turned by spin radians as a (height, width, 3) uint8 array"""
+        prof.count("frames_rendered")
+        if not self.loaded:
+            # If the Earth file couldn't be loaded, draw a placeholder
+            self.surface.fill(PLACEHOLDER_BACKGROUND)
+            text = self.font.render("Earth file not found", True, (255, 255, 255))
+            self.surface.blit(text, (10, self.height // 2))
+            return self.to_array()
+
+        self.surface.fill(BACKGROUND)
+
+        # Turn every point about the Z axis through the globe's centre at once
+        c, s = np.cos(spin), np.sin(spin)
+        relative = self.xyz[self.drawn] - self.center
+        x = self.center[0] + c * relative[:, 0] - s * relative[:, 1]
+        y = self.center[1] + s * relative[:, 0] + c * relative[:, 1]
+        z = self.xyz[self.drawn, 2]
+
+        # Only the half facing us is drawn
+        facing = np.flatnonzero(y > 0)
+        columns = (self.width / 2 + np.trunc(x[facing])).astype(int)
+        rows = (self.height / 2 + np.trunc(z[facing])).astype(int)
+        glyphs = self.glyphs
+        chars = self.drawn_chars
+        self.surface.blits([(glyphs[chars[i]], (column, row))
+                            for i, column, row in zip(facing.tolist(), columns.tolist(), rows.tolist())],
+                           doreturn=False)
+        return self.to_array()
+
+    def to_array(self):
+        # surfarray is indexed [x][y]; images are rows first
+        return np.ascontiguousarray(pg.surfarray.array3d(self.surface).swapaxes(0, 1))
+
+    def render_frames(self, count, start=0.0, end=2 * pi):
+        """Render count frames evenly spaced from spin start up to (not including) end.
+
+        Returns a (count, height, width, 3) uint8 array. The default is one full turn,
+        which loops without a jump."""
+        frames = np.empty((count, self.height, self.width, 3), dtype=np.uint8)
+        for i, spin in enumerate(np.linspace(start, end, count, endpoint=False)):
+            frames[i] = self.render(spin)
+        return frames
+
+# ---- Export ----
+
+def save_gif(frames, path, fps=30):
+    """Save frames as an animated GIF that loops forever (needs Pillow)"""
+    from PIL import Image
+    images = [Image.fromarray(frame) for frame in frames]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=round(1000 / fps), loop=0)
+
+def save_frames(frames, path, fps=30):
+    """Save frames by file extension: .gif, .npy (NumPy, keeps the shape) or anything
+    else as raw RGB bytes, one frame after another"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gif":
+        save_gif(frames, path, fps)
+    elif extension == ".npy":
+        np.save(path, frames)
+    else:
+        frames.tofile(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the spinning Earth without a window.")
+    parser.add_argument("--frames", type=int, default=60, help="how many frames to render (default 60)")
+    parser.add_argument("--size", type=int, default=150, help="width and height in pixels (default 150)")
+    parser.add_argument("--start", type=float, default=0.0, help="spin of the first frame in radians")
+    parser.add_argument("--end", type=float, default=2 * pi, help="spin the frames stop short of (default one turn)")
+    parser.add_argument("--fps", type=int, default=30, help="frame rate for GIFs (default 30)")
+    parser.add_argument("--output", help="file to write: .gif, .npy or raw RGB for anything else")
+    parser.add_argument("--bench", action="store_true", help="print how long each frame took")
+    args = parser.parse_args(argv)
+
+    globe = GlobeRenderer(args.size, args.size)
+    globe.render()  # The first frame warms up font caches
+    start = time.perf_counter()
+    frames = globe.render_frames(args.frames, args.start, args.end)
+    elapsed = time.perf_counter() - start
+
+    if args.bench:
+        print(f"{args.frames} frames of {args.size}x{args.size}: "
+              f"{elapsed / args.frames * 1000:.3f} ms per frame ({args.frames / elapsed:.0f} fps)")
+    if args.output:
+        try:
+            save_frames(frames, args.output, args.fps)
+        except ImportError:
+            print("Saving a GIF needs Pillow (pip install pillow); try .npy instead.", file=sys.stderr)
+            return 1
+        print(f"Saved {frames.shape[0]} frames of {frames.shape[2]}x{frames.shape[1]} to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,223 +1,57 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog, font
+from tkinter import ttk, messagebox, simpledialog, font, filedialog
 import password_manager_core as pm
+import password_manager_profile as prof
 import os
-import pygame as pg
-import numpy as np
-from math import pi, sin, cos
+import threading
+import itertools
+from datetime import datetime
 from PIL import Image, ImageTk  # Add this import
+from password_manager_globe import GlobeRenderer, SPIN_STEP
 
-# Initialize pygame for the Earth visualization
-pg.init()
-# Disable sound to prevent audio conflicts
-pg.mixer.quit()
-
+# The Tk side of the spinning Earth: GlobeRenderer draws the frames, this keeps the
+# globe turning and hands each frame to Tk as an image
 class SpinningEarth:
     def __init__(self, width=150, height=150):
-        # Set dimensions for the Earth visualization
         self.width = width
         self.height = height
-        
-        # Create a surface for rendering the Earth
-        self.surface = pg.Surface((width, height))
-        
-        # Set constants
-        self.FPS = 30
-        self.R = width // 4  # Radius scaled to the surface size
-        self.MAP_WIDTH = 139
-        self.MAP_HEIGHT = 34
-        
-        # Initialize font
-        self.my_font = pg.font.SysFont('arial', 6)  # Smaller font for the corner display
-        
-        # Load the Earth ASCII art
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, 'earth_W140_H35.txt')
-        
-        try:
-            with open(file_path, 'r') as file:
-                data = [file.read().replace('\n', '')]
-                
-            # Process ASCII characters
-            self.ascii_chars = []
-            for line in data:
-                for char in line:
-                    self.ascii_chars.append(char)
-            
-            self.inverted_ascii_chars = self.ascii_chars[::-1]
-            
-            # Create 3D coordinates
-            self.xyz = []
-            for i in range(self.MAP_HEIGHT + 1):
-                lat = (pi / self.MAP_HEIGHT) * i
-                for j in range(self.MAP_WIDTH + 1):
-                    lon = (2 * pi / self.MAP_WIDTH) * j
-                    x = round(self.R * sin(lat) * cos(lon), 2)
-                    y = round(self.R * sin(lat) * sin(lon), 2)
-                    z = round(self.R * cos(lat), 2)
-                    self.xyz.append((x, y, z))
-            
-            # Initialize spin angle
-            self.spin = 0
-            self.loaded = True
-            
-        except FileNotFoundError:
-            print(f"Earth file not found at: {file_path}")
-            # Create a simple placeholder file
-            self.create_placeholder_earth_file(file_path)
-            self.loaded = False
-    
-    def create_placeholder_earth_file(self, file_path):
-        """Create a simple placeholder Earth ASCII art file"""
-        try:
-            with open(file_path, 'w') as file:
-                # Basic ASCII Earth
-                earth_art = []
-                width, height = 139, 34
-                
-                for y in range(height):
-                    line = ""
-                    for x in range(width):
-                        dx, dy = x - width // 2, y - height // 2
-                        distance = (dx**2 + dy**2)**0.5
-                        
-                        if distance < width // 4:
-                            if (x + y) % 7 == 0:
-                                line += "#"  # Continents
-                            else:
-                                line += "~"  # Oceans
-                        else:
-                            line += " "
-                    earth_art.append(line)
-                
-                file.write('\n'.join(earth_art))
-            print(f"Created placeholder {file_path} file.")
-            
-            # Now that we created the file, load it
-            with open(file_path, 'r') as file:
-                data = [file.read().replace('\n', '')]
-                
-            # Process ASCII characters
-            self.ascii_chars = []
-            for line in data:
-                for char in line:
-                    self.ascii_chars.append(char)
-            
-            self.inverted_ascii_chars = self.ascii_chars[::-1]
-            
-            # Create 3D coordinates
-            self.xyz = []
-            for i in range(self.MAP_HEIGHT + 1):
-                lat = (pi / self.MAP_HEIGHT) * i
-                for j in range(self.MAP_WIDTH + 1):
-                    lon = (2 * pi / self.MAP_WIDTH) * j
-                    x = round(self.R * sin(lat) * cos(lon), 2)
-                    y = round(self.R * sin(lat) * sin(lon), 2)
-                    z = round(self.R * cos(lat), 2)
-                    self.xyz.append((x, y, z))
-                    
-            self.loaded = True
-            
-        except Exception as e:
-            print(f"Error creating placeholder Earth file: {e}")
+        self.renderer = GlobeRenderer(width, height)
+        self.spin = 0
     
     def update(self):
         # Increment the spin angle
-        self.spin += 0.05
+        self.spin += SPIN_STEP
     
     def render(self):
-        if not self.loaded:
-            # If the Earth file couldn't be loaded, draw a placeholder
-            self.surface.fill((10, 10, 60))
-            text = self.my_font.render("Earth file not found", True, (255, 255, 255))
-            self.surface.blit(text, (10, self.height // 2))
-            return self.surface
-        
-        # Clear the surface
-        self.surface.fill((0, 0, 50))
-        
-        # Create projection
-        pv = self.Projection(self.width, self.height, self.surface)
-        
-        # Create and render the globe
-        globe = self.Object()
-        globe_nodes = [i for i in self.xyz]
-        globe.addNodes(np.array(globe_nodes))
-        pv.addSurface('globe', globe)
-        pv.rotateAll(self.spin)
-        pv.display(self.inverted_ascii_chars, self.my_font, self.MAP_WIDTH, self.MAP_HEIGHT)
-        
-        return self.surface
+        """Return the current frame as a (height, width, 3) RGB array"""
+        return self.renderer.render(self.spin)
     
+    @prof.timed("gui.earth_render")
     def get_tk_image(self):
-        """Convert pygame surface to a tkinter-compatible image"""
-        # Render the Earth to a pygame surface
-        earth_surface = self.render()
-        
-        # Get the raw pixel data
-        raw_str = pg.image.tostring(earth_surface, 'RGB')
-        
-        # Create a PIL Image from the raw pixel data
-        image = Image.frombytes('RGB', (self.width, self.height), raw_str)
-        
-        # Convert PIL Image to Tkinter PhotoImage
-        tk_image = ImageTk.PhotoImage(image)
-        
-        return tk_image
-    
-    class Projection:
-        def __init__(self, width, height, surface):
-            self.width = width
-            self.height = height
-            self.surface = surface
-            self.background = (10, 10, 60)
-            self.surfaces = {}
+        """Convert the current frame to a tkinter-compatible image"""
+        return ImageTk.PhotoImage(Image.fromarray(self.render()))
 
-        def addSurface(self, name, surface):
-            self.surfaces[name] = surface
 
-        def display(self, inverted_ascii_chars, font, MAP_WIDTH, MAP_HEIGHT):
-            i = 0
-            for surface in self.surfaces.values():
-                for node in surface.nodes:
-                    text = inverted_ascii_chars[i]
-                    text_surface = font.render(text, False, (0, 255, 0))
-                    if i > MAP_WIDTH - 1 and i < (MAP_WIDTH * MAP_HEIGHT - MAP_WIDTH) and node[1] > 0:
-                        self.surface.blit(text_surface, (self.width / 2 + int(node[0]), self.height / 2 + int(node[2])))
-                    i += 1
+# How often (in ms) to refresh the --profile readout in the status bar
+PROFILE_READOUT_MS = 1000
 
-        def rotateAll(self, theta):
-            for surface in self.surfaces.values():
-                center = surface.findCentre()
+# Operations shown in the --profile readout
+PROFILE_READOUT = ["gui.earth_render", "gui.view_credentials", "core.load_credentials", "core.save_credentials"]
 
-                c = np.cos(theta)
-                s = np.sin(theta)
+# How often (in ms) to look at the vault file for changes made by the CLI or another window
+VAULT_POLL_MS = 1000
 
-                # Rotating about Z - axis
-                matrix = np.array([[c, -s, 0, 0],
-                                  [s, c, 0, 0],
-                                  [0, 0, 1, 0],
-                                  [0, 0, 0, 1]])
+# How many credentials VIEW CREDENTIALS shows per page
+PAGE_SIZE = 100
 
-                surface.rotate(center, matrix)
-    
-    class Object:
-        def __init__(self):
-            self.nodes = np.zeros((0, 4))
-
-        def addNodes(self, node_array):
-            ones_column = np.ones((len(node_array), 1))
-            ones_added = np.hstack((node_array, ones_column))
-            self.nodes = np.vstack((self.nodes, ones_added))
-
-        def findCentre(self):
-            mean = self.nodes.mean(axis=0)
-            return mean
-
-        def rotate(self, center, matrix):
-            for i, node in enumerate(self.nodes):
-                self.nodes[i] = center + np.matmul(matrix, node - center)
+# Search results shown straight away; the rest follow SEARCH_CHUNK at a time between other events
+SEARCH_FIRST_SCREEN = 40
+SEARCH_CHUNK = 200
+# Records looked at per turn of a search, so a turn stays short however rare the matches are
+SEARCH_SCAN_CHUNK = 5000
 
+# Sort orders offered above the listing, mapped to the core's sort fields
+SORT_CHOICES = {"RESOURCE": "resource", "USERNAME": "username", "DATE ADDED": "date_added"}
 
 class RetrowavePasswordManagerGUI:
     def __init__(self, root):
@@ -352,6 +186,18 @@ class RetrowavePasswordManagerGUI:
                                      **button_style)
         self.delete_button.grid(row=1, column=1, padx=10, pady=10)
         
+        self.report_button = tk.Button(buttons_frame, 
+                                     text="PASSWORD REPORT", 
+                                     command=self.password_report, 
+                                     **button_style)
+        self.report_button.grid(row=0, column=2, padx=10, pady=10)
+        
+        self.rotation_button = tk.Button(buttons_frame, 
+                                       text="ROTATION DUE", 
+                                       command=self.rotation_queue, 
+                                       **button_style)
+        self.rotation_button.grid(row=1, column=2, padx=10, pady=10)
+        
         # Create a retro-styled display frame
         self.display_frame = tk.Frame(self.main_frame, 
                                     bg="#000000", 
@@ -380,6 +226,61 @@ class RetrowavePasswordManagerGUI:
         # Set display text as read-only
         self.display_text.config(state=tk.DISABLED)
         
+        # Page controls under the listing
+        nav_frame = ttk.Frame(self.main_frame)
+        nav_frame.pack(fill=tk.X)
+        nav_style = dict(button_style, width=10, height=1)
+        
+        self.prev_button = tk.Button(nav_frame, 
+                                   text="< PREV", 
+                                   command=self.previous_page, 
+                                   **nav_style)
+        self.prev_button.pack(side=tk.LEFT)
+        
+        self.page_var = tk.StringVar()
+        self.page_var.set("PAGE 1/1")
+        tk.Label(nav_frame, 
+                textvariable=self.page_var, 
+                bg="#000033", 
+                fg="#00ccff",
+                font=self.button_font).pack(side=tk.LEFT, padx=10)
+        
+        self.next_button = tk.Button(nav_frame, 
+                                   text="NEXT >", 
+                                   command=self.next_page, 
+                                   **nav_style)
+        self.next_button.pack(side=tk.LEFT)
+        
+        # Vault picker: every vault opened so far keeps its copy in memory, so switching is instant
+        tk.Label(nav_frame, 
+                text="VAULT:", 
+                bg="#000033", 
+                fg="#00ccff",
+                font=self.button_font).pack(side=tk.LEFT, padx=(20, 5))
+        self.vault_var = tk.StringVar()
+        self.vault_menu = tk.OptionMenu(nav_frame, self.vault_var, "")
+        self.vault_menu.config(bg="#303030", fg="#00ffff", activebackground="#505050", 
+                               activeforeground="#ff00ff", font=self.button_font, relief="raised")
+        self.vault_menu.pack(side=tk.LEFT)
+        
+        self.open_vault_button = tk.Button(nav_frame, 
+                                         text="OPEN...", 
+                                         command=self.open_vault, 
+                                         **nav_style)
+        self.open_vault_button.pack(side=tk.LEFT, padx=5)
+        
+        self.sort_var = tk.StringVar()
+        self.sort_var.set("RESOURCE")
+        sort_menu = tk.OptionMenu(nav_frame, self.sort_var, *SORT_CHOICES, command=self.change_sort)
+        sort_menu.config(bg="#303030", fg="#00ffff", activebackground="#505050", 
+                         activeforeground="#ff00ff", font=self.button_font, relief="raised")
+        sort_menu.pack(side=tk.RIGHT)
+        tk.Label(nav_frame, 
+                text="SORT BY:", 
+                bg="#000033", 
+                fg="#00ccff",
+                font=self.button_font).pack(side=tk.RIGHT, padx=10)
+        
         # 90s-style status bar
         self.status_var = tk.StringVar()
         self.status_var.set("SYSTEM READY...")
@@ -393,9 +294,36 @@ class RetrowavePasswordManagerGUI:
                                  font=("MS Sans Serif", 9))
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        # With --profile, the right end of the status bar shows live timings
+        if prof.enabled:
+            self.profile_var = tk.StringVar()
+            self.profile_label = tk.Label(self.status_bar, 
+                                        textvariable=self.profile_var, 
+                                        bg="#303030", 
+                                        fg="#ff00ff",
+                                        font=("MS Sans Serif", 9))
+            self.profile_label.pack(side=tk.RIGHT)
+            self.root.after(PROFILE_READOUT_MS, self.update_profile_readout)
+        
+        # In-memory copy of the vault, used to notice changes made by other programs
+        self.vault = pm.get_vault()
+        self.vault.add_listener(self.on_vault_changed)
+        self.current_view = None
+        self.sections = {}
+        self.row_counter = 0
+        self.page = 0
+        self.sort_by = "resource"
+        self.descending = False
+        self.search_cancel = None   # set while search results are still streaming in
+        self.search_removed = set()
+        self.refresh_vault_menu()
+        
         # Setup periodic Earth update
         self.running = True
         self.update_earth()
+        
+        # Check the vault file for changes once a second
+        self.root.after(VAULT_POLL_MS, self.check_vault_changes)
     
     def update_earth(self):
         """Update the spinning Earth visualization"""
@@ -420,13 +348,327 @@ class RetrowavePasswordManagerGUI:
                 # Try again in 100ms if there was an error
                 self.root.after(100, self.update_earth)
 
+    def update_profile_readout(self):
+        """Show the latest timings in the status bar"""
+        if not self.running:
+            return
+        self.profile_var.set(prof.live_readout(PROFILE_READOUT))
+        self.root.after(PROFILE_READOUT_MS, self.update_profile_readout)
+    
+    def check_vault_changes(self):
+        """Pick up changes other programs made to the vault file"""
+        if not self.running:
+            return
+        try:
+            # Any changes found are passed to on_vault_changed
+            self.vault.poll_changes()
+        except Exception as e:
+            print(f"Error checking vault: {e}")
+        self.root.after(VAULT_POLL_MS, self.check_vault_changes)
+    
+    def on_vault_changed(self, added, removed):
+        """Apply credentials added or removed (by us or on disk) to what is on screen"""
+        # Only the changed rows are touched; the vault file is never read again for this
+        if self.current_view == "all":
+            self.apply_listing_changes(added, removed)
+        elif self.current_view == "search":
+            self.apply_search_changes(added, removed)
+        self.status_var.set(f"VAULT UPDATED: +{len(added)} / -{len(removed)} CREDENTIALS - "
+                            f"{pm.count_credentials()} STORED")
+    
     def update_display_text(self, text):
         """Update the display text area with the given text"""
+        self.stop_search()
+        self.current_view = None
+        self.sections = {}
         self.display_text.config(state=tk.NORMAL)
         self.display_text.delete(1.0, tk.END)
+        # Forget the per-row tags of the previous listing
+        old_tags = [tag for tag in self.display_text.tag_names() if tag != "sel"]
+        if old_tags:
+            self.display_text.tag_delete(*old_tags)
         self.display_text.insert(tk.END, text)
         self.display_text.config(state=tk.DISABLED)
     
+    def section_name(self, cred):
+        """The section a credential is shown in: its category, or the one list of search results"""
+        if self.current_view == "search":
+            return "results"
+        return cred.get("category", "Uncategorized")
+    
+    def insert_section(self, category):
+        """Add an empty category section at the end of the listing"""
+        self.row_counter += 1
+        section_tag = f"section{self.row_counter}"
+        header = f"\n== {category.upper()} ==\n" + "═" * (len(category) + 6) + "\n\n"
+        self.display_text.insert(tk.END, header, (section_tag,))
+        self.sections[category] = {"tag": section_tag, "rows": []}
+        return self.sections[category]
+    
+    def insert_row(self, cred, sort_key, append=False):
+        """Add one credential to its category section.
+        
+        The row is put in sort_key order among the rows already there, or straight at
+        the end with append=True when the caller already adds rows in order."""
+        category = self.section_name(cred)
+        section = self.sections.get(category) or self.insert_section(category)
+        rows = section["rows"]
+        
+        # Find the first row that should come after the new one
+        i = len(rows)
+        if not append:
+            for i, row in enumerate(rows):
+                if (row["sort_key"] < sort_key) if self.descending else (row["sort_key"] > sort_key):
+                    break
+            else:
+                i = len(rows)
+        
+        self.row_counter += 1
+        row = {"cred": cred, "sort_key": sort_key,
+               "tag": f"row{self.row_counter}", "number_tag": f"num{self.row_counter}"}
+        tags = (section["tag"], row["tag"])
+        if i < len(rows):
+            position = self.display_text.index(f"{rows[i]['tag']}.first")
+        else:
+            position = self.display_text.index(f"{section['tag']}.last")
+        
+        row_text = (f" Resource: {cred['resource']}\n"
+                    f"   Username: {cred['username']}\n"
+                    f"   Password: {cred['password']}\n")
+        # Search results mix categories, so they say which one instead of the date
+        if self.current_view == "search":
+            row_text += f"   Category: {cred.get('category', 'Uncategorized')}\n"
+        else:
+            row_text += f"   Added on: {cred.get('date_added', 'Unknown')}\n"
+        row_text += f"   --------------------------------\n\n"
+        # Insert the text first and the number in front of it, each with its own tags
+        self.display_text.insert(position, row_text, tags)
+        self.display_text.insert(position, f"#{i + 1}", tags + (row["number_tag"],))
+        rows.insert(i, row)
+        self.renumber_rows(section, i + 1)
+    
+    def remove_row(self, cred):
+        """Remove one credential from the listing and renumber the rows after it"""
+        category = self.section_name(cred)
+        section = self.sections.get(category)
+        if not section:
+            return False
+        
+        # The vault keeps the same object for a credential that didn't change, so rows are
+        # matched by identity and one of two identical rows is never mistaken for the other
+        for i, row in enumerate(section["rows"]):
+            if row["cred"] is cred:
+                break
+        else:
+            return False
+        
+        self.display_text.delete(f"{row['tag']}.first", f"{row['tag']}.last")
+        self.display_text.tag_delete(row["tag"], row["number_tag"])
+        del section["rows"][i]
+        
+        # Drop the whole section once it is empty, like a fresh listing would
+        # (search results keep their header, which then says nothing matched)
+        if not section["rows"] and self.current_view == "all":
+            self.display_text.delete(f"{section['tag']}.first", f"{section['tag']}.last")
+            self.display_text.tag_delete(section["tag"])
+            del self.sections[category]
+            return True
+        
+        self.renumber_rows(section, i)
+        return True
+    
+    def renumber_rows(self, section, start):
+        """Rewrite the #numbers of the rows from start onwards; the rows above keep theirs"""
+        for number, row in enumerate(section["rows"][start:], start + 1):
+            position = self.display_text.index(f"{row['number_tag']}.first")
+            self.display_text.delete(position, f"{row['number_tag']}.last")
+            self.display_text.insert(position, f"#{number}", (section["tag"], row["tag"], row["number_tag"]))
+    
+    def apply_listing_changes(self, added, removed):
+        """Update the current page of the listing in place instead of redrawing it"""
+        # An empty vault shows a placeholder message rather than sections
+        if not self.sections:
+            self.view_credentials()
+            return
+        
+        # A change anywhere before this page shifts rows onto or off it, so work out what a
+        # fresh listing of the page would hold and only change the rows that differ
+        page = self.vault.sorted.page(self.sort_by, self.descending,
+                                      offset=self.page * PAGE_SIZE, limit=PAGE_SIZE)
+        if not page and self.page:
+            # The vault shrank below this page; go back to the last one that still exists
+            self.view_credentials()
+            return
+        
+        wanted = {id(cred) for cred in page}
+        shown = {id(row["cred"]): row["cred"] for section in self.sections.values() for row in section["rows"]}
+        self.display_text.config(state=tk.NORMAL)
+        for cred_id, cred in shown.items():
+            if cred_id not in wanted:
+                self.remove_row(cred)
+        for cred in page:
+            if id(cred) not in shown:
+                self.insert_row(cred, self.vault.sorted.sort_key(cred, self.sort_by))
+        self.display_text.config(state=tk.DISABLED)
+        
+        if not self.sections:
+            self.update_display_text("[ NO CREDENTIALS STORED YET ]")
+            self.current_view = "all"
+        self.update_page_status()
+    
+    def show_search_results(self, search_term, matches, cancel=None):
+        """Display search results as rows that apply_search_changes can update later.
+        
+        cancel is the token of a search that is still streaming more results in."""
+        self.update_display_text("")
+        self.current_view = "search"
+        self.search_term = search_term
+        self.search_cancel = cancel
+        self.search_removed = set()
+        
+        # The count line doubles as the section header, so rows are added after it
+        self.display_text.config(state=tk.NORMAL)
+        self.display_text.insert(tk.END, self.search_header(len(matches)), ("results", "search_count"))
+        self.sections["results"] = {"tag": "results", "rows": []}
+        for cred in matches:
+            self.insert_row(cred, None, append=True)
+        self.display_text.config(state=tk.DISABLED)
+        self.update_search_status()
+    
+    def next_search_matches(self, search, count):
+        """Take up to count matches, scanning at most SEARCH_SCAN_CHUNK more records to find them"""
+        credentials, pending = search["credentials"], search["pending"]
+        if len(pending) < count and search["position"] < len(credentials):
+            start = search["position"]
+            search["position"] = min(start + SEARCH_SCAN_CHUNK, len(credentials))
+            pending.extend(pm.filter_credentials(credentials[start:search["position"]], search["term"]))
+        matches = pending[:count]
+        del pending[:count]
+        return matches
+    
+    def stream_search_results(self, search, cancel):
+        """Add the next chunk of matches, then give Tk a turn before the one after"""
+        if cancel.is_set() or not self.running:
+            return
+        
+        with prof.timer("gui.search_display"):
+            chunk = self.next_search_matches(search, SEARCH_CHUNK)
+            self.display_text.config(state=tk.NORMAL)
+            for cred in chunk:
+                # Skip anything deleted since the search started, it's already gone from the vault
+                if id(cred) not in self.search_removed:
+                    self.insert_row(cred, None, append=True)
+            self.display_text.config(state=tk.DISABLED)
+            
+            if not search["pending"] and search["position"] >= len(search["credentials"]):
+                self.search_cancel = None
+                self.search_removed = set()
+            self.update_search_count()
+        
+        if self.search_cancel is cancel:
+            self.root.after(1, self.stream_search_results, search, cancel)
+    
+    def stop_search(self):
+        """Stop any search that is still streaming results in"""
+        if self.search_cancel is not None:
+            self.search_cancel.set()
+            self.search_cancel = None
+    
+    def search_header(self, count):
+        if self.search_cancel is not None:
+            return f"[ SEARCHING... {count} MATCHING CREDENTIALS SO FAR ]\n\n"
+        if not count:
+            return "[ NO MATCHING CREDENTIALS FOUND ]\n\n"
+        return f"[ FOUND {count} MATCHING CREDENTIALS ]\n\n"
+    
+    def apply_search_changes(self, added, removed):
+        """Update the search results in place: drop removed rows, add new matches at the end"""
+        self.display_text.config(state=tk.NORMAL)
+        for cred in removed:
+            self.remove_row(cred)
+            if self.search_cancel is not None:
+                self.search_removed.add(id(cred))
+        for cred in pm.filter_credentials(added, self.search_term):
+            self.insert_row(cred, None, append=True)
+        self.display_text.config(state=tk.DISABLED)
+        self.update_search_count()
+    
+    def update_search_count(self):
+        """Rewrite the count line, keeping its tags, and the status bar"""
+        self.display_text.config(state=tk.NORMAL)
+        position = self.display_text.index("search_count.first")
+        self.display_text.delete(position, "search_count.last")
+        self.display_text.insert(position, self.search_header(len(self.sections["results"]["rows"])),
+                                 ("results", "search_count"))
+        self.display_text.config(state=tk.DISABLED)
+        self.update_search_status()
+    
+    def update_search_status(self):
+        count = len(self.sections["results"]["rows"])
+        if self.search_cancel is not None:
+            self.status_var.set(f"SEARCHING... {count} FOUND SO FAR")
+        elif count:
+            self.status_var.set(f"FOUND {count} MATCHING CREDENTIALS")
+        else:
+            self.status_var.set("SEARCH COMPLETE - NO MATCHES FOUND")
+    
+    def update_page_status(self):
+        """Show which page of the listing is on screen"""
+        total = pm.count_credentials()
+        pages = max(1, -(-total // PAGE_SIZE))
+        shown = sum(len(section["rows"]) for section in self.sections.values())
+        self.page_var.set(f"PAGE {self.page + 1}/{pages}")
+        self.status_var.set(f"DISPLAYING {shown} OF {total} CREDENTIALS...")
+    
+    def refresh_vault_menu(self):
+        """List the known vaults in the picker, with the open one selected"""
+        menu = self.vault_menu["menu"]
+        menu.delete(0, tk.END)
+        for path in pm.known_vaults():
+            menu.add_command(label=pm.vault_label(path), command=lambda path=path: self.switch_vault(path))
+        self.vault_var.set(pm.vault_label(self.vault.path))
+    
+    def switch_vault(self, path):
+        """Show another vault; everything else in the window then works on that one"""
+        if os.path.abspath(path) == self.vault.path:
+            return
+        self.vault.remove_listener(self.on_vault_changed)
+        self.vault = pm.switch_vault(path)
+        self.vault.add_listener(self.on_vault_changed)
+        self.refresh_vault_menu()
+        
+        self.view_credentials(0)
+        self.status_var.set(f"SWITCHED TO {pm.vault_label(path).upper()} - "
+                            f"{pm.count_credentials()} CREDENTIALS")
+    
+    def open_vault(self):
+        """Pick a vault file to open; a new name creates a new vault on the first save"""
+        path = filedialog.asksaveasfilename(parent=self.root, 
+                                            title="OPEN OR CREATE VAULT", 
+                                            initialdir=os.path.dirname(self.vault.path), 
+                                            defaultextension=".json", 
+                                            filetypes=[("Vault files", "*.json")], 
+                                            confirmoverwrite=False)
+        if path:
+            self.switch_vault(path)
+    
+    def previous_page(self):
+        """Show the previous page of the listing"""
+        if self.page > 0:
+            self.view_credentials(self.page - 1)
+    
+    def next_page(self):
+        """Show the next page of the listing"""
+        if (self.page + 1) * PAGE_SIZE < pm.count_credentials():
+            self.view_credentials(self.page + 1)
+    
+    def change_sort(self, *args):
+        """Re-list from the first page in the newly chosen order"""
+        self.sort_by = SORT_CHOICES[self.sort_var.get()]
+        # Newest first makes more sense than oldest first for dates
+        self.descending = self.sort_by == "date_added"
+        self.view_credentials(0)
+    
     def create_retro_toplevel(self, title, size="400x300"):
         """Create a retro-styled toplevel window"""
         window = tk.Toplevel(self.root)
@@ -499,15 +741,34 @@ class RetrowavePasswordManagerGUI:
                 messagebox.showerror("ERROR", "Resource/Website cannot be empty")
                 return
             
+            # If this account is already saved, offer to update it instead of adding a duplicate
+            existing = pm.find_credential(resource, username)
+            if existing and not messagebox.askyesno("ALREADY SAVED",
+                                                    f"A credential for {resource} ({username}) already exists.\n\nUpdate its password?"):
+                return
+            
+            # Warn before saving a password that is already used elsewhere
+            reused = [cred for cred in pm.find_password_reuse(password)
+                      if not any(cred is other for other in existing)]
+            if reused:
+                used_for = "\n".join(f"{cred['resource']} ({cred['username']})" for cred in reused[:5])
+                if len(reused) > 5:
+                    used_for += f"\n...and {len(reused) - 5} more"
+                if not messagebox.askyesno("PASSWORD REUSED",
+                                           f"This password is already used for:\n{used_for}\n\nSave it anyway?",
+                                           icon='warning'):
+                    return
+            
             # Call core function to add credential
-            result = pm.add_credential(username, password, resource, category)
+            result = pm.add_credential(username, password, resource, category, upsert=bool(existing))
             
             if result:
-                messagebox.showinfo("SUCCESS", "Credential added successfully")
+                messagebox.showinfo("SUCCESS", "Credential updated successfully" if existing else "Credential added successfully")
                 add_window.destroy()
                 
-                # Update status with retro vibe
-                self.status_var.set("NEW CREDENTIAL ADDED SUCCESSFULLY")
+                # Update status with retro vibe (on_vault_changed has already put the row on screen)
+                message = "CREDENTIAL UPDATED SUCCESSFULLY" if existing else "NEW CREDENTIAL ADDED SUCCESSFULLY"
+                self.status_var.set(f"{message} - {pm.count_credentials()} STORED")
             else:
                 messagebox.showerror("ERROR", "Failed to save credential")
         
@@ -528,36 +789,108 @@ class RetrowavePasswordManagerGUI:
                                 font=self.button_font)
         cancel_button.pack(side=tk.LEFT, padx=10)
     
-    def view_credentials(self):
-        """Display all credentials in the text area"""
-        categories = pm.get_credentials_by_category()
+    @prof.timed("gui.view_credentials")
+    def view_credentials(self, page=None):
+        """Display one page of credentials in the text area"""
+        # Bring our copy of the vault up to date; the whole page is redrawn anyway
+        self.current_view = None
+        self.vault.poll_changes()
+        
+        if page is not None:
+            self.page = page
+        total = pm.count_credentials()
+        # Stay on the last page if the vault shrank underneath us
+        self.page = max(0, min(self.page, (total - 1) // PAGE_SIZE))
+        
+        if not total:
+            self.update_display_text("[ NO CREDENTIALS STORED YET ]")
+            self.current_view = "all"
+            self.update_page_status()
+            return
         
-        if not categories:
+        # The core keeps the vault sorted, so this only fetches the rows on screen
+        credentials_page = pm.list_credentials(self.sort_by, self.descending,
+                                               offset=self.page * PAGE_SIZE, limit=PAGE_SIZE)
+        
+        # Each credential gets its own text tags so later changes can be applied row by row
+        # Rows land in their category section, which is created the first time it is needed
+        self.update_display_text("")
+        self.display_text.config(state=tk.NORMAL)
+        for cred in credentials_page:
+            self.insert_row(cred, self.vault.sorted.sort_key(cred, self.sort_by), append=True)
+        
+        self.display_text.config(state=tk.DISABLED)
+        self.current_view = "all"
+        self.update_page_status()
+    
+    def password_report(self):
+        """Show reused passwords and a strength score for every password"""
+        report = pm.password_report()
+        
+        if not report["scores"]:
             self.update_display_text("[ NO CREDENTIALS STORED YET ]")
             return
         
-        # Format the display text
-        display_text = ""
-        total_count = 0
+        display_text = f"[ {len(report['reused'])} PASSWORDS USED MORE THAN ONCE ]\n\n"
+        for i, group in enumerate(report["reused"], 1):
+            display_text += f"#{i} Shared by:\n"
+            for cred in group:
+                display_text += f"   {cred['resource']} ({cred['username']})\n"
+            display_text += f"   --------------------------------\n\n"
         
-        for category, creds in categories.items():
-            display_text += f"\n== {category.upper()} ==\n"
-            display_text += "═" * (len(category) + 6) + "\n\n"
-            total_count += len(creds)
-            
-            for i, cred in enumerate(creds, 1):
+        display_text += "[ PASSWORD STRENGTH - WEAKEST FIRST ]\n\n"
+        for cred, entropy, strength in report["scores"]:
+            display_text += f"{strength:<11} {entropy:>6} bits   {cred['resource']} ({cred['username']})\n"
+        
+        self.update_display_text(display_text)
+        self.status_var.set(f"REPORT: {len(report['reused'])} REUSED PASSWORDS, "
+                            f"{len(report['scores'])} CREDENTIALS SCORED")
+    
+    def rotation_queue(self):
+        """Show the passwords older than pm.ROTATION_DAYS, oldest first"""
+        due = pm.due_for_rotation()
+        
+        if not due:
+            self.update_display_text(f"[ NO PASSWORDS OLDER THAN {pm.ROTATION_DAYS} DAYS ]")
+            self.status_var.set("ROTATION: NOTHING DUE")
+            return
+        
+        now = datetime.now()
+        display_text = f"[ {len(due)} PASSWORDS OLDER THAN {pm.ROTATION_DAYS} DAYS - OLDEST FIRST ]\n\n"
+        for i, cred in enumerate(due, 1):
+            age = pm.credential_age_days(cred, now)
+            age = "UNKNOWN AGE" if age is None else f"{age} DAYS"
+            display_text += f"#{i} {cred['resource']} ({cred['username']})\n"
+            display_text += f"   Added on: {cred.get('date_added', 'Unknown')} - {age}\n"
+            display_text += f"   --------------------------------\n\n"
+        
+        self.update_display_text(display_text)
+        self.status_var.set(f"ROTATION: {len(due)} OF {pm.count_credentials()} PASSWORDS DUE")
+    
+    def show_all_vault_results(self, results):
+        """Display (vault label, credential) pairs from a search of every vault"""
+        vault_count = len(pm.known_vaults())
+        if not results:
+            self.update_display_text(f"[ NO MATCHING CREDENTIALS FOUND IN {vault_count} VAULTS ]")
+            self.status_var.set("SEARCH COMPLETE - NO MATCHES FOUND")
+            return
+        
+        display_text = f"[ FOUND {len(results)} MATCHING CREDENTIALS IN {vault_count} VAULTS ]\n"
+        for label, matches in itertools.groupby(results, key=lambda result: result[0]):
+            display_text += f"\n== VAULT: {label.upper()} ==\n" + "═" * (len(label) + 13) + "\n\n"
+            for i, (label, cred) in enumerate(matches, 1):
                 display_text += f"#{i} Resource: {cred['resource']}\n"
                 display_text += f"   Username: {cred['username']}\n"
                 display_text += f"   Password: {cred['password']}\n"
-                display_text += f"   Added on: {cred.get('date_added', 'Unknown')}\n"
+                display_text += f"   Category: {cred.get('category', 'Uncategorized')}\n"
                 display_text += f"   --------------------------------\n\n"
         
         self.update_display_text(display_text)
-        self.status_var.set(f"DISPLAYING {total_count} CREDENTIALS...")
+        self.status_var.set(f"FOUND {len(results)} MATCHING CREDENTIALS ACROSS {vault_count} VAULTS")
     
     def search_credentials(self):
         """Search for credentials based on user input"""
-        search_window = self.create_retro_toplevel("SEARCH DATABASE", "400x150")
+        search_window = self.create_retro_toplevel("SEARCH DATABASE", "400x190")
         
         frame = tk.Frame(search_window, bg="#000033", padx=20, pady=20)
         frame.pack(fill=tk.BOTH, expand=True)
@@ -570,36 +903,47 @@ class RetrowavePasswordManagerGUI:
         search_entry.grid(row=0, column=1, padx=10, pady=10)
         search_entry.focus_set()
         
+        all_vaults_var = tk.BooleanVar()
+        tk.Checkbutton(frame, text="SEARCH ALL VAULTS", variable=all_vaults_var,
+                       bg="#000033", fg="#00ccff", selectcolor="#000000",
+                       activebackground="#000033", activeforeground="#ff00ff",
+                       font=self.text_font).grid(row=1, column=0, columnspan=2, sticky=tk.W, padx=10)
+        
         def execute_search():
             search_term = search_var.get().strip()
             if not search_term:
                 messagebox.showwarning("WARNING", "Search term cannot be empty")
                 return
             
-            # Call core function to search
-            matches = pm.search_credentials(search_term)
+            # Every vault is searched at the same time, each on its own thread
+            if all_vaults_var.get():
+                with prof.timer("gui.search_display"):
+                    self.show_all_vault_results(pm.search_all_vaults(search_term))
+                search_window.destroy()
+                return
             
-            # Display results
-            if matches:
-                display_text = f"[ FOUND {len(matches)} MATCHING CREDENTIALS ]\n\n"
-                
-                for i, cred in enumerate(matches, 1):
-                    display_text += f"#{i} Resource: {cred['resource']}\n"
-                    display_text += f"   Username: {cred['username']}\n"
-                    display_text += f"   Password: {cred['password']}\n"
-                    display_text += f"   Category: {cred.get('category', 'Uncategorized')}\n"
-                    display_text += f"   --------------------------------\n\n"
-                
-                self.update_display_text(display_text)
-                self.status_var.set(f"FOUND {len(matches)} MATCHING CREDENTIALS")
-            else:
-                self.update_display_text("[ NO MATCHING CREDENTIALS FOUND ]")
-                self.status_var.set("SEARCH COMPLETE - NO MATCHES FOUND")
+            # The vault is searched a slice at a time, so the first screenful can be shown
+            # before the search has gone through the whole vault. It searches the vault as it
+            # is now; changes made meanwhile reach the results through on_vault_changed.
+            self.vault.poll_changes()
+            search = {"term": search_term, "credentials": self.vault.credentials, "position": 0, "pending": []}
+            cancel = threading.Event()
+            
+            # Display results (timed separately from the search itself for --profile)
+            with prof.timer("gui.search_display"):
+                first_screen = self.next_search_matches(search, SEARCH_FIRST_SCREEN)
+                more = bool(search["pending"]) or search["position"] < len(search["credentials"])
+                self.show_search_results(search_term, first_screen, cancel if more else None)
+            
+            # The rest stream in from the event loop, each turn doing a bounded amount of
+            # work, so the window keeps responding and a new view can cancel the search
+            if more:
+                self.root.after(1, self.stream_search_results, search, cancel)
             
             search_window.destroy()
         
         button_frame = tk.Frame(frame, bg="#000033")
-        button_frame.grid(row=1, column=0, columnspan=2, pady=20)
+        button_frame.grid(row=2, column=0, columnspan=2, pady=20)
         
         search_button = tk.Button(button_frame, text="SEARCH", command=execute_search,
                                 relief="raised", borderwidth=2, width=10,
@@ -617,7 +961,9 @@ class RetrowavePasswordManagerGUI:
     
     def delete_credential(self):
         """Delete a credential selected by the user"""
-        credentials_list = pm.load_credentials()
+        # The in-memory copy is already up to date after a stat(), no need to read the file
+        self.vault.poll_changes()
+        version, credentials_list = self.vault.version, self.vault.credentials
         
         if not credentials_list:
             messagebox.showinfo("INFO", "No credentials stored yet.")
@@ -666,15 +1012,19 @@ class RetrowavePasswordManagerGUI:
                                          icon='warning')
             
             if confirm == 'yes':
-                deleted_cred = pm.delete_credential(index)
+                try:
+                    deleted_cred = pm.delete_credential(index, expected_version=version)
+                except pm.VaultConflictError:
+                    messagebox.showerror("ERROR", "The vault was changed by another program.\nPlease reopen this window and try again.")
+                    delete_window.destroy()
+                    return
                 
                 if deleted_cred:
                     messagebox.showinfo("SUCCESS", f"Credential for {deleted_cred['resource']} has been DELETED")
                     delete_window.destroy()
                     
-                    # Update display
-                    self.view_credentials()
-                    self.status_var.set("CREDENTIAL DELETED SUCCESSFULLY")
+                    # The row has already been taken off the screen by on_vault_changed
+                    self.status_var.set(f"CREDENTIAL DELETED SUCCESSFULLY - {pm.count_credentials()} STORED")
         
         button_frame = tk.Frame(frame, bg="#000033")
         button_frame.pack(pady=10)
@@ -695,8 +1045,9 @@ class RetrowavePasswordManagerGUI:
     
     def on_closing(self):
         """Clean up resources when the application is closing"""
-        # Stop the Earth animation
+        # Stop the Earth animation and any search still running
         self.running = False
+        self.stop_search()
         
         # Destroy the root window
         self.root.destroy()
@@ -0,0 +1,133 @@
+# Timing and counters for the slow parts of the password manager
+#
+# Everything here is switched off by default. While it is off, timed functions only pay
+# for one "if" and the counters return straight away, so the hooks can stay in the code.
+# Turn it on with --profile on main.py or password_manager_core.py, or call enable().
+import sys
+import time
+import atexit
+import functools
+
+enabled = False
+
+# operation name -> Histogram of how long it took
+timings = {}
+# counter name -> running total (bytes read, records scanned...)
+counters = {}
+
+# Latency histogram with power-of-two buckets in microseconds, so it never grows
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = {}  # bucket number -> count; bucket n holds times below 2**n microseconds
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        bucket = int(seconds * 1_000_000).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding this fraction of samples, in seconds"""
+        wanted = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min(2 ** bucket / 1_000_000, self.max)
+        return self.max
+
+def enable(dump_at_exit=False):
+    global enabled
+    enabled = True
+    if dump_at_exit:
+        atexit.register(dump)
+
+def disable():
+    global enabled
+    enabled = False
+
+def reset():
+    timings.clear()
+    counters.clear()
+
+def record(name, seconds):
+    """Add one timing sample for an operation"""
+    if not enabled:
+        return
+    histogram = timings.get(name)
+    if histogram is None:
+        histogram = timings[name] = Histogram()
+    histogram.add(seconds)
+
+def count(name, amount=1):
+    """Add to a counter"""
+    if enabled:
+        counters[name] = counters.get(name, 0) + amount
+
+# Decorator that records how long each call takes, under the given name
+def timed(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+# Context manager version of timed(), for timing part of a function
+class timer:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if enabled:
+            record(self.name, time.perf_counter() - self.start)
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.3f}"
+
+def summary():
+    """Return a table of every timing and counter collected so far"""
+    lines = ["--- PROFILE ---"]
+    if timings:
+        lines.append(f"{'operation':<28}{'calls':>8}{'total ms':>11}{'mean ms':>10}"
+                     f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for name, histogram in sorted(timings.items()):
+            lines.append(f"{name:<28}{histogram.count:>8}{histogram.total * 1000:>11.1f}"
+                         f"{_ms(histogram.total / histogram.count):>10}{_ms(histogram.percentile(0.5)):>10}"
+                         f"{_ms(histogram.percentile(0.95)):>10}{_ms(histogram.max):>10}")
+    if counters:
+        lines.append("")
+        for name, value in sorted(counters.items()):
+            lines.append(f"{name:<28}{value:>12}")
+    if len(lines) == 1:
+        lines.append("nothing recorded")
+    return "\n".join(lines)
+
+def live_readout(names):
+    """A one-line summary of the latest means for the GUI status bar"""
+    parts = []
+    for name in names:
+        histogram = timings.get(name)
+        if histogram and histogram.count:
+            parts.append(f"{name.split('.')[-1].upper()} {histogram.total / histogram.count * 1000:.1f}ms")
+    return " | ".join(parts)
+
+def dump(file=None):
+    print(summary(), file=file or sys.stderr)